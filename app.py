@@ -3,12 +3,18 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-import plotly.figure_factory as ff
 import plotly.graph_objects as go
-import joblib
-import os
+import logging
 from data_ingestion import load_data
-from data_processing import prepare_data_for_modeling
+from feature_store import default_store, load_rate_frame
+from data_indexing import MunicipalityIndex, RateDistributionIndex, RowFilterIndex
+from similarity import SimilarMunicipalityIndex
+from model_registry import ModelRegistry
+from scenarios import ScenarioEngine, shock
+from warmup import CacheWarmup
+from charts import (EDA_FIGURE_BUILDERS, EDA_FIGURE_COLUMNS, CRIME_COLUMNS, format_crime_label,
+                    format_target_label, build_model_results_table, build_model_metric_bar,
+                    build_feature_importance_bar)
 
 # Configuração da página
 st.set_page_config(
@@ -48,22 +54,211 @@ st.markdown("""
 def load_cached_data():
     return load_data()
 
-# Carregar modelo
+# Registro de modelos: versão publicada trocada em segundo plano, sem reiniciar
 @st.cache_resource
-def load_model():
-    model_path = 'models/best_model.pkl'
-    if os.path.exists(model_path):
-        return joblib.load(model_path)
-    return None
+def load_model_registry():
+    return ModelRegistry('models')
+
+# Taxas por 100 mil habitantes calculadas uma única vez
+# (objeto compartilhado entre sessões: tratado como somente leitura)
+@st.cache_resource
+def load_rate_data():
+    return load_rate_frame()
+
+# Índice por município (construído uma vez e compartilhado entre sessões)
+@st.cache_resource
+def load_municipality_index():
+    return MunicipalityIndex(load_rate_data())
+
+# Distribuição de referência das taxas (construída uma vez e compartilhada entre sessões)
+@st.cache_resource
+def load_rate_distribution(count_column='vitimas_totais'):
+    return RateDistributionIndex(load_rate_data(), rate_column=f'{count_column}_por100mil',
+                                 count_column=count_column)
+
+# Índice KD-tree construído a partir da feature store quando a versão não o inclui
+@st.cache_resource
+def build_neighbors_index():
+    X, Y = default_store.get()
+    return SimilarMunicipalityIndex().fit(X, Y['vitimas_totais'], load_cached_data())
+
+# Motor de cenários por versão do modelo (features da feature store)
+@st.cache_resource
+def load_scenario_engine(version, _predictor):
+    X, _ = default_store.get()
+    return ScenarioEngine(_predictor, load_cached_data(), X)
 
 df = load_cached_data()
-model_data = load_model()
+
+# Snapshot do modelo usado durante toda esta execução do script
+model_version = load_model_registry().current()
+model_data = model_version['model_data'] if model_version else None
+
+# ============================================================================
+# ANÁLISE EXPLORATÓRIA: DADOS E FIGURAS EM CACHE
+# ============================================================================
+# Bitmaps por UF e por ano sobre as linhas de load_rate_data()
+@st.cache_resource
+def load_row_filter_index():
+    return RowFilterIndex(load_rate_data())
+
+@st.cache_data
+def filter_positions(ufs, year_range):
+    return load_row_filter_index().positions(ufs, year_range)
+
+@st.cache_data
+def filter_data(ufs, year_range, columns=None):
+    df_rates = load_rate_data()
+    if columns is not None:
+        df_rates = df_rates[list(columns)]
+    return df_rates.iloc[filter_positions(ufs, year_range)]
+
+@st.cache_data
+def build_eda_figure(nome, filtros, *args):
+    # Argumentos extras das figuras são nomes de colunas
+    colunas = tuple(dict.fromkeys(EDA_FIGURE_COLUMNS[nome] + list(args)))
+    return EDA_FIGURE_BUILDERS[nome](filter_data(*filtros, colunas), *args)
+
+ABAS_EDA = ["🗺️ Por UF", "🔥 Correlações", "📉 Taxas Padronizadas", "📅 Evolução Temporal"]
+
+# Cada seção é um fragment: seus widgets reexecutam apenas a própria seção
+@st.fragment
+def render_eda_descriptive(filtros):
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### Variáveis Numéricas")
+        numeric_cols = load_rate_data().select_dtypes(include=[np.number]).columns.tolist()
+        selected_var = st.selectbox("Selecione uma variável:", numeric_cols)
+        
+        desc_stats = filter_data(*filtros, (selected_var,))[selected_var].describe()
+        st.dataframe(desc_stats.to_frame(), use_container_width=True)
+    
+    with col2:
+        st.markdown("### Distribuição")
+        fig_hist = build_eda_figure('histograma', filtros, selected_var)
+        st.plotly_chart(fig_hist, use_container_width=True)
+
+@st.fragment
+def render_eda_visualizations(filtros):
+    # Apenas a aba selecionada é calculada
+    aba = st.radio("Visualização:", ABAS_EDA, horizontal=True, label_visibility="collapsed")
+    
+    if aba == "🗺️ Por UF":
+        st.markdown("### Total de Crimes por UF")
+        st.plotly_chart(build_eda_figure('uf', filtros), use_container_width=True)
+        
+        st.info("💡 **Observação:** A criminalidade absoluta é maior em municípios mais populosos. " 
+                "Para comparações justas entre municípios, use taxas padronizadas por 100 mil habitantes.")
+    
+    elif aba == "🔥 Correlações":
+        render_eda_correlations(filtros)
+    
+    elif aba == "📉 Taxas Padronizadas":
+        st.markdown("### Taxas de Vítimas por 100 mil Habitantes")
+        st.plotly_chart(build_eda_figure('taxas', filtros), use_container_width=True)
+        
+        st.success("✅ **Vantagem da Padronização:** Permite comparar municípios independentemente do tamanho populacional.")
+    
+    else:
+        render_eda_temporal(filtros)
+
+@st.fragment
+def render_eda_correlations(filtros):
+    st.markdown("### Matriz de Correlação")
+    
+    corr_option = st.radio(
+        "Escolha o tipo de correlação:",
+        ["Variáveis Econômicas e Criminalidade", "PIB per capita × Taxas de Crime"]
+    )
+    
+    if corr_option == "Variáveis Econômicas e Criminalidade":
+        st.plotly_chart(build_eda_figure('correlacao', filtros), use_container_width=True)
+        
+        st.markdown("""
+        **📌 Interpretação:**
+        - PIB total apresenta alta correlação com criminalidade absoluta (municípios maiores)
+        - PIB per capita mostra baixa correlação, indicando que riqueza média não prediz criminalidade
+        - População é o fator mais correlacionado com crimes totais
+        """)
+    
+    else:
+        st.plotly_chart(build_eda_figure('correlacao_taxas', filtros), use_container_width=True)
+        
+        st.markdown("""
+        **📌 Interpretação:**
+        - Quando normalizamos por população, a correlação do PIB per capita com criminalidade permanece fraca
+        - Isso sugere que desenvolvimento econômico individual não é suficiente para reduzir criminalidade
+        - Outros fatores sociais e estruturais podem ser mais relevantes
+        """)
+
+@st.fragment
+def render_eda_temporal(filtros):
+    st.markdown("### Evolução Temporal da Criminalidade")
+    
+    crime_type = st.selectbox(
+        "Selecione o tipo de crime:",
+        options=CRIME_COLUMNS,
+        format_func=format_crime_label
+    )
+    
+    st.plotly_chart(build_eda_figure('temporal', filtros, crime_type), use_container_width=True)
+
+# ============================================================================
+# AQUECIMENTO DOS CACHES EM SEGUNDO PLANO
+# ============================================================================
+def default_filters():
+    """Filtros iniciais da Análise Exploratória (todas as UFs, período completo)"""
+    df_base = load_cached_data()
+    return ((), (int(df_base['ano'].min()), int(df_base['ano'].max())))
+
+def _warm_figures():
+    filtros = default_filters()
+    variavel = load_rate_data().select_dtypes(include=[np.number]).columns[0]
+    filter_positions(*filtros)
+    filter_data(*filtros, (variavel,))
+    for nome in ('uf', 'correlacao', 'correlacao_taxas', 'taxas'):
+        build_eda_figure(nome, filtros)
+    build_eda_figure('temporal', filtros, CRIME_COLUMNS[0])
+    build_eda_figure('histograma', filtros, variavel)
+
+def _warm_model():
+    # Bundle, índice de similaridade e multi-alvo são carregados sob demanda:
+    # adianta a carga aqui, fora da primeira predição
+    snapshot = load_model_registry().current()
+    if snapshot:
+        snapshot.load_all()
+
+def _warm_scenarios():
+    snapshot = load_model_registry().current()
+    if snapshot:
+        load_scenario_engine(snapshot['version'], snapshot['predictor'])
+
+class _WarmupLogFilter(logging.Filter):
+    # As threads de aquecimento não têm ScriptRunContext (de propósito: sem spinner)
+    def filter(self, record):
+        return not record.threadName.startswith('cache-warmup')
+
+# Iniciado uma única vez por processo, na primeira execução do script
+@st.cache_resource
+def start_cache_warmup():
+    logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').addFilter(_WarmupLogFilter())
+    return CacheWarmup([
+        {'dados': load_cached_data, 'modelo': _warm_model},
+        {'taxas': load_rate_data, 'perfis': load_municipality_index,
+         'distribuicao': load_rate_distribution},
+        {'filtros': load_row_filter_index, 'cenarios': _warm_scenarios},
+        {'figuras': _warm_figures}
+    ]).start()
+
+cache_warmup = start_cache_warmup()
 
 # Sidebar para navegação
 st.sidebar.title("📑 Navegação")
 page = st.sidebar.radio(
     "Selecione uma página:",
-    ["🏠 Introdução", "📊 Análise Exploratória", "🤖 Modelagem Preditiva", "🎯 Fazer Predição"]
+    ["🏠 Introdução", "📊 Análise Exploratória", "🏙️ Perfil Municipal", "🤖 Modelagem Preditiva", "🎯 Fazer Predição",
+     "🧪 Simulação de Cenários"]
 )
 
 # ============================================================================
@@ -182,16 +377,6 @@ if page == "🏠 Introdução":
 elif page == "📊 Análise Exploratória":
     st.markdown('<p class="main-header">📊 Análise Exploratória de Dados</p>', unsafe_allow_html=True)
     
-    # Calcular taxas por 100 mil habitantes
-    cols_crimes = ['vitimas_feminicidio', 'vitimas_homicidio_doloso',
-                   'vitimas_tentativa_homicidio', 'vitimas_totais',
-                   'vitimas_lesao_corporal_seguida_de_morte',
-                   'vitimas_transito_ou_decorrencia_dele', 'vitimas_sem_indicio_de_crime',
-                   'vitimas_latrocinio', 'vitimas_suicidios']
-    
-    for col in cols_crimes:
-        df[f'{col}_por100mil'] = df[col] / df['Total_Habitantes'] * 100000
-    
     # Seção 1: Visualização dos Dados
     st.markdown('<p class="section-header">🔍 Explorar Dataset</p>', unsafe_allow_html=True)
     
@@ -212,175 +397,99 @@ elif page == "📊 Análise Exploratória":
             value=(int(df['ano'].min()), int(df['ano'].max()))
         )
     
-    # Aplicar filtros
-    df_filtered = df.copy()
-    if selected_uf:
-        df_filtered = df_filtered[df_filtered['uf'].isin(selected_uf)]
-    df_filtered = df_filtered[(df_filtered['ano'] >= year_range[0]) & 
-                              (df_filtered['ano'] <= year_range[1])]
+    # Aplicar filtros (resultado em cache por combinação de filtros)
+    filtros = (tuple(sorted(selected_uf)), tuple(year_range))
+    # Cabeçalho: só a contagem e as 10 primeiras linhas (sem copiar o recorte inteiro)
+    posicoes = filter_positions(*filtros)
     
     with col2:
-        st.markdown(f"### Dados Filtrados ({len(df_filtered)} registros)")
-        st.dataframe(df_filtered.head(10), use_container_width=True, height=300)
+        st.markdown(f"### Dados Filtrados ({len(posicoes)} registros)")
+        st.dataframe(load_rate_data().iloc[posicoes[:10]], use_container_width=True, height=300)
     
     # Estatísticas Descritivas
     st.markdown('<p class="section-header">📈 Estatísticas Descritivas</p>', unsafe_allow_html=True)
+    render_eda_descriptive(filtros)
     
-    col1, col2 = st.columns(2)
+    # Gráficos Interativos
+    st.markdown('<p class="section-header">📊 Visualizações Interativas</p>', unsafe_allow_html=True)
+    render_eda_visualizations(filtros)
+
+# ============================================================================
+# PÁGINA 3: PERFIL MUNICIPAL
+# ============================================================================
+elif page == "🏙️ Perfil Municipal":
+    st.markdown('<p class="main-header">🏙️ Perfil Municipal</p>', unsafe_allow_html=True)
+    
+    municipality_index = load_municipality_index()
+    
+    municipio = st.selectbox(
+        "Selecione o município:",
+        options=municipality_index.municipalities
+    )
+    
+    perfil = municipality_index.get(municipio)
+    serie = perfil['series']
+    
+    col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.markdown("### Variáveis Numéricas")
-        numeric_cols = df_filtered.select_dtypes(include=[np.number]).columns.tolist()
-        selected_var = st.selectbox("Selecione uma variável:", numeric_cols)
-        
-        desc_stats = df_filtered[selected_var].describe()
-        st.dataframe(desc_stats.to_frame(), use_container_width=True)
+        st.metric("📍 UF", perfil['uf'])
     
     with col2:
-        st.markdown("### Distribuição")
-        fig_hist = px.histogram(
-            df_filtered, 
-            x=selected_var,
-            title=f"Distribuição de {selected_var}",
-            color_discrete_sequence=['#1f77b4']
-        )
-        st.plotly_chart(fig_hist, use_container_width=True)
+        # Última população informada (anos sem o dado são ignorados)
+        populacao = serie['Total_Habitantes'].dropna()
+        st.metric("👥 População", f"{int(populacao.iloc[-1]):,}" if len(populacao) else "—")
     
-    # Gráficos Interativos
-    st.markdown('<p class="section-header">📊 Visualizações Interativas</p>', unsafe_allow_html=True)
+    with col3:
+        st.metric("📈 Taxa Média (100 mil hab.)",
+                  "—" if pd.isna(perfil['taxa_media']) else f"{perfil['taxa_media']:.2f}")
     
-    tab1, tab2, tab3, tab4 = st.tabs(["🗺️ Por UF", "🔥 Correlações", "📉 Taxas Padronizadas", "📅 Evolução Temporal"])
+    with col4:
+        st.metric("🏅 Ranking na UF",
+                  "—" if perfil['rank_uf'] is None else f"{perfil['rank_uf']}º de {perfil['pares_uf']}")
     
-    with tab1:
-        st.markdown("### Total de Crimes por UF")
-        df_uf = df_filtered.groupby('uf', as_index=False)['vitimas_totais'].sum().sort_values('vitimas_totais', ascending=False)
-        
-        fig1 = px.bar(
-            df_uf, 
-            x='uf', 
-            y='vitimas_totais',
-            title='Total de Crimes por Unidade Federativa',
-            labels={'vitimas_totais': 'Total de Vítimas', 'uf': 'UF'},
-            color='vitimas_totais',
-            color_continuous_scale='Reds'
-        )
-        fig1.update_layout(height=500)
-        st.plotly_chart(fig1, use_container_width=True)
-        
-        st.info("💡 **Observação:** A criminalidade absoluta é maior em municípios mais populosos. " 
-                "Para comparações justas entre municípios, use taxas padronizadas por 100 mil habitantes.")
+    st.markdown('<p class="section-header">📅 Evolução no Período</p>', unsafe_allow_html=True)
     
-    with tab2:
-        st.markdown("### Matriz de Correlação")
-        
-        corr_option = st.radio(
-            "Escolha o tipo de correlação:",
-            ["Variáveis Econômicas e Criminalidade", "PIB per capita × Taxas de Crime"]
-        )
-        
-        if corr_option == "Variáveis Econômicas e Criminalidade":
-            cols_selecionadas = [
-                'vl_agropecuaria', 'vl_industria', 'vl_servicos', 'vl_administracao',
-                'vl_bruto_total', 'vl_subsidios', 'vl_pib', 'vl_pib_per_capta',
-                'Total_Habitantes'
-            ] + cols_crimes
-            
-            numeric_df = df_filtered[cols_selecionadas]
-            corr = numeric_df.corr().round(2)
-            
-            fig_corr = ff.create_annotated_heatmap(
-                z=corr.values,
-                x=list(corr.columns),
-                y=list(corr.index),
-                colorscale='Greens',
-                zmin=-1, zmax=1,
-                showscale=True
-            )
-            fig_corr.update_layout(
-                title="Correlação: Variáveis Econômicas × Criminalidade", 
-                width=1200, height=800
-            )
-            st.plotly_chart(fig_corr, use_container_width=True)
-            
-            st.markdown("""
-            **📌 Interpretação:**
-            - PIB total apresenta alta correlação com criminalidade absoluta (municípios maiores)
-            - PIB per capita mostra baixa correlação, indicando que riqueza média não prediz criminalidade
-            - População é o fator mais correlacionado com crimes totais
-            """)
-        
-        else:
-            colunas_taxas = [f'{c}_por100mil' for c in cols_crimes] + ['vl_pib_per_capta']
-            corr_taxas = df_filtered[colunas_taxas].corr()
-            
-            fig_taxas = go.Figure(data=go.Heatmap(
-                z=corr_taxas.values,
-                x=corr_taxas.columns,
-                y=corr_taxas.columns,
-                colorscale='Blues',
-                zmin=-1,
-                zmax=1,
-                showscale=True,
-                text=corr_taxas.values.round(2),
-                texttemplate="%{text}"
-            ))
-            fig_taxas.update_layout(
-                title='Correlação: PIB per capita × Taxas de Crime (por 100 mil hab.)', 
-                width=900, height=700
-            )
-            st.plotly_chart(fig_taxas, use_container_width=True)
-            
-            st.markdown("""
-            **📌 Interpretação:**
-            - Quando normalizamos por população, a correlação do PIB per capita com criminalidade permanece fraca
-            - Isso sugere que desenvolvimento econômico individual não é suficiente para reduzir criminalidade
-            - Outros fatores sociais e estruturais podem ser mais relevantes
-            """)
+    col1, col2 = st.columns(2)
     
-    with tab3:
-        st.markdown("### Taxas de Vítimas por 100 mil Habitantes")
-        
-        colunas_taxas_vitimas = [f'{c}_por100mil' for c in cols_crimes]
-        df_media = df_filtered[colunas_taxas_vitimas].mean().sort_values()
-        
-        fig_vitimas = px.bar(
-            df_media, 
-            x=df_media.values, 
-            y=df_media.index, 
-            orientation='h',
-            title='Taxas Médias de Vítimas por 100 mil habitantes',
-            labels={'x': 'Taxa por 100 mil habitantes', 'y': 'Tipo de Crime'},
-            color=df_media.values,
-            color_continuous_scale='Oranges'
+    with col1:
+        fig_mun = px.line(
+            serie,
+            x='ano',
+            y='vitimas_totais_por100mil',
+            title=f'Taxa de Vítimas por 100 mil hab. - {municipio}',
+            labels={'vitimas_totais_por100mil': 'Taxa por 100 mil hab.', 'ano': 'Ano'},
+            markers=True
         )
-        fig_vitimas.update_layout(height=500, showlegend=False)
-        st.plotly_chart(fig_vitimas, use_container_width=True)
-        
-        st.success("✅ **Vantagem da Padronização:** Permite comparar municípios independentemente do tamanho populacional.")
+        fig_mun.update_layout(height=400)
+        st.plotly_chart(fig_mun, use_container_width=True)
     
-    with tab4:
-        st.markdown("### Evolução Temporal da Criminalidade")
-        
-        crime_type = st.selectbox(
-            "Selecione o tipo de crime:",
-            options=cols_crimes,
-            format_func=lambda x: x.replace('vitimas_', '').replace('_', ' ').title()
-        )
-        
-        df_temporal = df_filtered.groupby('ano')[crime_type].sum().reset_index()
-        
-        fig_temporal = px.line(
-            df_temporal,
+    with col2:
+        fig_rank = px.bar(
+            serie,
             x='ano',
-            y=crime_type,
-            title=f'Evolução de {crime_type.replace("vitimas_", "").replace("_", " ").title()} ao Longo do Tempo',
-            markers=True
+            y='rank_uf_ano',
+            title='Posição Anual no Ranking da UF (1 = maior taxa)',
+            labels={'rank_uf_ano': 'Posição', 'ano': 'Ano'},
+            color_discrete_sequence=['#1f77b4']
         )
-        fig_temporal.update_layout(height=400)
-        st.plotly_chart(fig_temporal, use_container_width=True)
+        fig_rank.update_layout(height=400, yaxis_autorange='reversed')
+        st.plotly_chart(fig_rank, use_container_width=True)
+    
+    st.markdown("### Taxas por Tipo de Crime (por 100 mil hab.)")
+    colunas_taxas = [f'{c}_por100mil' for c in municipality_index.crime_columns]
+    st.dataframe(serie.set_index('ano')[colunas_taxas].round(2), use_container_width=True)
+    
+    st.markdown(f"### Municípios da UF {perfil['uf']}")
+    pares = pd.DataFrame([
+        {'Município': p['municipio'], 'Ranking': p['rank_uf'], 'Taxa Média': p['taxa_media']}
+        for p in municipality_index.peers(perfil['uf'])
+    ])
+    pares['Ranking'] = pares['Ranking'].astype('Int64')
+    st.dataframe(pares.set_index('Ranking').round(2), use_container_width=True, height=300)
 
 # ============================================================================
-# PÁGINA 3: MODELAGEM PREDITIVA
+# PÁGINA 4: MODELAGEM PREDITIVA
 # ============================================================================
 elif page == "🤖 Modelagem Preditiva":
     st.markdown('<p class="main-header">🤖 Modelagem Preditiva e Comparação de Modelos</p>', unsafe_allow_html=True)
@@ -396,12 +505,7 @@ elif page == "🤖 Modelagem Preditiva":
     if model_data:
         st.markdown('<p class="section-header">📊 Comparação de Modelos</p>', unsafe_allow_html=True)
         
-        results_df = pd.DataFrame(model_data['all_results']).T
-        results_df = results_df.round(4)
-        
-        # Formatar para exibição
-        display_df = results_df[['r2_test', 'rmse_test', 'mae_test', 'cv_r2_mean', 'cv_r2_std']].copy()
-        display_df.columns = ['R² (Teste)', 'RMSE (Teste)', 'MAE (Teste)', 'CV R² (Média)', 'CV R² (Std)']
+        display_df = build_model_results_table(model_data['all_results'])
         
         # Destacar melhor modelo
         best_idx = display_df['R² (Teste)'].idxmax()
@@ -418,29 +522,20 @@ elif page == "🤖 Modelagem Preditiva":
         col1, col2 = st.columns(2)
         
         with col1:
-            fig_r2 = px.bar(
-                x=display_df.index,
-                y=display_df['R² (Teste)'],
-                title='Comparação de R² entre Modelos',
-                labels={'x': 'Modelo', 'y': 'R² (Teste)'},
-                color=display_df['R² (Teste)'],
-                color_continuous_scale='Viridis'
-            )
-            fig_r2.update_layout(showlegend=False)
+            fig_r2 = build_model_metric_bar(display_df, 'R² (Teste)', 'Viridis')
             st.plotly_chart(fig_r2, use_container_width=True)
         
         with col2:
-            fig_rmse = px.bar(
-                x=display_df.index,
-                y=display_df['RMSE (Teste)'],
-                title='Comparação de RMSE entre Modelos',
-                labels={'x': 'Modelo', 'y': 'RMSE (Teste)'},
-                color=display_df['RMSE (Teste)'],
-                color_continuous_scale='Reds_r'
-            )
-            fig_rmse.update_layout(showlegend=False)
+            fig_rmse = build_model_metric_bar(display_df, 'RMSE (Teste)', 'Reds_r')
             st.plotly_chart(fig_rmse, use_container_width=True)
         
+        # Importância das Features
+        if model_data.get('feature_importance'):
+            st.markdown('<p class="section-header">🔍 Importância das Features</p>', unsafe_allow_html=True)
+            
+            fig_imp = build_feature_importance_bar(model_data['feature_importance'])
+            st.plotly_chart(fig_imp, use_container_width=True)
+        
         # Interpretação
         st.markdown('<p class="section-header">📝 Interpretação dos Resultados</p>', unsafe_allow_html=True)
         
@@ -487,15 +582,28 @@ elif page == "🤖 Modelagem Preditiva":
         st.warning("⚠️ Modelo não encontrado. Execute o script `modeling.py` primeiro.")
 
 # ============================================================================
-# PÁGINA 4: FAZER PREDIÇÃO
+# PÁGINA 5: FAZER PREDIÇÃO
 # ============================================================================
 elif page == "🎯 Fazer Predição":
     st.markdown('<p class="main-header">🎯 Fazer Predição Interativa</p>', unsafe_allow_html=True)
     
     if model_data:
+        # Alvos disponíveis: vitimas_totais (modelo principal) e, se treinados, os demais
+        multi_target = model_version['multi_target']
+        alvos = ['vitimas_totais']
+        if multi_target:
+            alvos += [t for t in multi_target['targets'] if t != 'vitimas_totais']
+        
+        alvo = st.selectbox("🎯 Variável a Prever", alvos, format_func=format_target_label)
+        modelo_principal = alvo == 'vitimas_totais'
+        alvo_info = model_data if modelo_principal else multi_target['targets'][alvo]
+        predictor = model_version['predictor'] if modelo_principal else alvo_info['model']
+        alvo_taxa = alvo.endswith('_por100mil')
+        coluna_contagem = alvo[:-len('_por100mil')] if alvo_taxa else alvo
+        
         st.markdown(f"""
-        Utilize o modelo **{model_data['model_name']}** (R² = {model_data['metrics']['r2_test']:.4f}) 
-        para prever o número de vítimas em um município hipotético.
+        Utilize o modelo **{alvo_info['model_name']}** (R² = {alvo_info['metrics']['r2_test']:.4f}) 
+        para prever **{format_target_label(alvo)}** em um município hipotético.
         """)
         
         st.markdown('<p class="section-header">📝 Insira os Dados do Município</p>', unsafe_allow_html=True)
@@ -548,6 +656,14 @@ elif page == "🎯 Fazer Predição":
                 step=10000.0,
                 help="Valor adicionado do setor de serviços"
             )
+            
+            rate_distribution = load_rate_distribution(coluna_contagem)
+            uf_referencia = st.selectbox(
+                "📍 UF de Referência",
+                options=['Todas'] + rate_distribution.ufs,
+                help="População usada para o percentil e a comparação"
+            )
+            uf_referencia = None if uf_referencia == 'Todas' else uf_referencia
         
         # Botão de predição
         if st.button("🔮 Fazer Predição", type="primary", use_container_width=True):
@@ -560,33 +676,37 @@ elif page == "🎯 Fazer Predição":
                 'vl_servicos': [vl_servicos]
             })
             
-            # Fazer predição
-            prediction = model_data['model'].predict(input_data)[0]
+            # Fazer predição (alvos em taxa são convertidos para número de vítimas)
+            prediction = predictor.predict(input_data)[0]
+            if alvo_taxa:
+                prediction = prediction * total_habitantes / 100000
             
             # Exibir resultado
             st.markdown('<p class="section-header">📊 Resultado da Predição</p>', unsafe_allow_html=True)
             
-            col1, col2, col3 = st.columns(3)
+            col1, col2, col3, col4 = st.columns(4)
             
             with col1:
                 st.metric("🎯 Vítimas Previstas", f"{int(prediction):,}")
+                if modelo_principal and model_data.get('interval_model'):
+                    intervalo = model_data['interval_model'].predict_interval(input_data).iloc[0]
+                    st.caption(f"IC 90% (bootstrap): {intervalo['lower']:.0f} a {intervalo['upper']:.0f}")
             
             with col2:
                 taxa = (prediction / total_habitantes) * 100000
                 st.metric("📈 Taxa por 100 mil hab.", f"{taxa:.2f}")
             
             with col3:
-                # Classificação
-                if taxa < 50:
-                    nivel = "🟢 Baixo"
-                elif taxa < 100:
-                    nivel = "🟡 Médio"
-                else:
-                    nivel = "🔴 Alto"
+                percentil = rate_distribution.percentile(taxa, uf=uf_referencia)
+                st.metric("📊 Percentil da Taxa", f"{percentil:.0f}º")
+            
+            with col4:
+                # Classificação pelos tercis da distribuição de referência
+                nivel = rate_distribution.risk_level(taxa, uf=uf_referencia)
                 st.metric("⚠️ Nível de Risco", nivel)
             
             # Comparação com média
-            media_geral = df['vitimas_totais'].mean()
+            media_geral = rate_distribution.mean_count(uf=uf_referencia)
             diff_percent = ((prediction - media_geral) / media_geral) * 100
             
             if diff_percent > 0:
@@ -594,6 +714,46 @@ elif page == "🎯 Fazer Predição":
             else:
                 st.success(f"✅ Este município teria **{abs(diff_percent):.1f}% menos vítimas** que a média geral ({media_geral:.0f} vítimas).")
             
+            # Municípios com taxas mais próximas
+            st.markdown("### 🏙️ Municípios Comparáveis (taxa mais próxima)")
+            comparaveis = rate_distribution.nearest(taxa, k=5, uf=uf_referencia)
+            comparaveis.columns = ['Município', 'UF', 'Ano', 'Taxa por 100 mil hab.']
+            st.dataframe(comparaveis.round(2), use_container_width=True, hide_index=True)
+            
+            # Municípios reais mais similares no espaço das features
+            st.markdown("### 🔎 Municípios Reais Mais Similares (perfil econômico e populacional)")
+            neighbors_index = model_version['neighbors_index'] or build_neighbors_index()
+            similares = neighbors_index.query(input_data, k=5)[['municipio_agrupado', 'uf', 'ano', 'distancia']]
+            similares = similares.merge(
+                load_rate_data()[['municipio_agrupado', 'ano', coluna_contagem]],
+                on=['municipio_agrupado', 'ano'], how='left'
+            )[['municipio_agrupado', 'uf', 'ano', coluna_contagem, 'distancia']]
+            similares.columns = ['Município', 'UF', 'Ano', 'Vítimas Reais', 'Distância']
+            st.dataframe(similares.round(3), use_container_width=True, hide_index=True)
+            st.caption("Cada município aparece uma vez, no ano de perfil mais próximo da entrada; "
+                       "as vítimas reais são as registradas nesse ano.")
+            
+            # Contribuição de cada feature para a predição
+            if modelo_principal and model_data.get('explainer'):
+                st.markdown("### 🧩 Contribuição de Cada Variável")
+                base_value, contribuicoes = model_data['explainer'].explain(input_data)
+                contribuicoes = contribuicoes.iloc[0]
+                
+                fig_contrib = go.Figure(go.Waterfall(
+                    orientation='v',
+                    measure=['absolute'] + ['relative'] * len(contribuicoes) + ['total'],
+                    x=['Valor Base'] + contribuicoes.index.tolist() + ['Predição'],
+                    y=[base_value[0]] + contribuicoes.tolist() + [0],
+                    text=[f'{base_value[0]:.1f}'] + [f'{v:+.1f}' for v in contribuicoes] + [f'{prediction:.1f}'],
+                    textposition='outside'
+                ))
+                fig_contrib.update_layout(
+                    title='Decomposição da Predição por Variável',
+                    yaxis_title='Número de Vítimas',
+                    height=450
+                )
+                st.plotly_chart(fig_contrib, use_container_width=True)
+            
             # Gráfico de comparação
             fig_comp = go.Figure()
             
@@ -639,26 +799,114 @@ elif page == "🎯 Fazer Predição":
         else:
             var_range = np.linspace(0, base_values[var_sensibilidade] * 3, 50)
         
-        predictions_sensitivity = []
-        for val in var_range:
-            temp_values = base_values.copy()
-            temp_values[var_sensibilidade] = val
-            temp_df = pd.DataFrame([temp_values])
-            pred = model_data['model'].predict(temp_df)[0]
-            predictions_sensitivity.append(pred)
+        # Todas as variações avaliadas em um único lote
+        sensitivity_df = pd.DataFrame([base_values] * len(var_range))
+        sensitivity_df[var_sensibilidade] = var_range
+        predictions_sensitivity = predictor.predict(sensitivity_df)
         
         fig_sens = px.line(
             x=var_range,
             y=predictions_sensitivity,
             title=f'Impacto de {var_sensibilidade} na Predição',
-            labels={'x': var_sensibilidade, 'y': 'Vítimas Previstas'}
+            labels={'x': var_sensibilidade, 'y': f'{format_target_label(alvo)} (previsto)'}
         )
         fig_sens.update_traces(line_color='#1f77b4', line_width=3)
+        
+        if modelo_principal and model_data.get('interval_model'):
+            banda = model_data['interval_model'].predict_interval(sensitivity_df)
+            fig_sens.add_trace(go.Scatter(
+                x=var_range, y=banda['upper'], mode='lines',
+                line=dict(width=0), showlegend=False, hoverinfo='skip'
+            ))
+            fig_sens.add_trace(go.Scatter(
+                x=var_range, y=banda['lower'], mode='lines', line=dict(width=0),
+                fill='tonexty', fillcolor='rgba(31, 119, 180, 0.2)', name='IC 90%'
+            ))
+        
         st.plotly_chart(fig_sens, use_container_width=True)
         
     else:
         st.error("❌ Modelo não encontrado. Por favor, execute o script `modeling.py` para treinar os modelos primeiro.")
 
+# ============================================================================
+# PÁGINA 6: SIMULAÇÃO DE CENÁRIOS
+# ============================================================================
+elif page == "🧪 Simulação de Cenários":
+    st.markdown('<p class="main-header">🧪 Simulação de Cenários</p>', unsafe_allow_html=True)
+    
+    if model_data:
+        engine = load_scenario_engine(model_version['version'], model_version['predictor'])
+        
+        st.markdown(f"""
+        Aplique choques econômicos a **todos os {len(engine.municipios)} municípios** (última 
+        observação de cada um) e compare as vítimas previstas pelo modelo **{model_data['model_name']}** 
+        com a linha de base.
+        """)
+        
+        st.markdown('<p class="section-header">⚙️ Definir Cenário</p>', unsafe_allow_html=True)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            colunas_choque = st.multiselect(
+                "Variáveis com choque:",
+                options=engine.features,
+                default=['vl_industria']
+            )
+            choques = []
+            for coluna in colunas_choque:
+                c1, c2 = st.columns(2)
+                with c1:
+                    pct = st.number_input(f"Variação de {coluna} (%)", min_value=-90.0, max_value=500.0,
+                                          value=10.0, step=5.0, key=f"pct_{coluna}")
+                with c2:
+                    ufs_choque = st.multiselect(f"UFs afetadas ({coluna}):", options=sorted(set(engine.ufs)),
+                                                key=f"ufs_{coluna}", help="Vazio = todas as UFs")
+                choques.append(shock(coluna, pct, ufs_choque))
+        
+        with col2:
+            pib_growth = st.slider(
+                "📈 Crescimento anual do PIB per capita (%)",
+                min_value=-5.0, max_value=10.0, value=0.0, step=0.5
+            )
+            target_year = st.slider(
+                "Ano alvo da projeção:",
+                min_value=int(engine.anos.max()), max_value=2040, value=2030
+            )
+        
+        por_municipio, por_uf = engine.simulate(choques, pib_growth, target_year)
+        
+        st.markdown('<p class="section-header">📊 Resultado do Cenário</p>', unsafe_allow_html=True)
+        
+        total_base = por_municipio['linha_base'].sum()
+        total_cenario = por_municipio['cenario'].sum()
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Vítimas (linha de base)", f"{total_base:,.0f}")
+        with col2:
+            st.metric("Vítimas (cenário)", f"{total_cenario:,.0f}",
+                      delta=f"{total_cenario - total_base:+,.0f}", delta_color="inverse")
+        with col3:
+            st.metric("Variação", f"{(total_cenario - total_base) / total_base * 100:+.2f}%" if total_base else "-")
+        
+        fig_uf = px.bar(
+            por_uf, x='uf', y='delta',
+            title='Variação de Vítimas Previstas por UF',
+            labels={'uf': 'UF', 'delta': 'Variação (vítimas)'},
+            color='delta', color_continuous_scale='RdYlGn_r', text=por_uf['delta'].round(1)
+        )
+        fig_uf.update_layout(height=400)
+        st.plotly_chart(fig_uf, use_container_width=True)
+        
+        st.markdown("### Variação por Município")
+        tabela = por_municipio.sort_values('delta', key=np.abs, ascending=False)
+        tabela.columns = ['Município', 'UF', 'Ano Base', 'Linha de Base', 'Cenário', 'Variação', 'Variação (%)']
+        st.dataframe(tabela.round(2), use_container_width=True, hide_index=True)
+        
+    else:
+        st.error("❌ Modelo não encontrado. Por favor, execute o script `modeling.py` para treinar os modelos primeiro.")
+
 # Footer
 st.sidebar.markdown("---")
 st.sidebar.markdown("""
@@ -670,3 +918,12 @@ desenvolvimento econômico e criminalidade na RIDE/DF.
 
 **Tecnologias:** Python, Streamlit, Scikit-learn, Plotly
 """)
+
+if model_version:
+    st.sidebar.caption(f"🤖 Versão do modelo: {model_version['version']}")
+
+status_warmup = cache_warmup.status()
+if status_warmup['ready']:
+    st.sidebar.caption(f"✅ Caches prontos ({status_warmup['elapsed_s']:.1f}s)")
+else:
+    st.sidebar.caption(f"🔥 Aquecendo caches: {status_warmup['done']}/{status_warmup['total']}")
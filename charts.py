@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Script de Construção de Gráficos
+Funções que montam as figuras Plotly do dashboard a partir dos dados
+"""
+
+import pandas as pd
+import plotly.express as px
+import plotly.figure_factory as ff
+import plotly.graph_objects as go
+from data_processing import CrimeRateCalculator
+
+CRIME_COLUMNS = CrimeRateCalculator().crime_columns
+
+ECONOMIC_COLUMNS = [
+    'vl_agropecuaria', 'vl_industria', 'vl_servicos', 'vl_administracao',
+    'vl_bruto_total', 'vl_subsidios', 'vl_pib', 'vl_pib_per_capta',
+    'Total_Habitantes'
+]
+
+RATE_COLUMNS = [f'{c}_por100mil' for c in CRIME_COLUMNS]
+
+
+def format_crime_label(col):
+    """Converte o nome da coluna de crime em rótulo legível"""
+    return col.replace('vitimas_', '').replace('_', ' ').title()
+
+
+def format_target_label(col):
+    """Rótulo legível de um alvo de modelagem (contagem ou taxa)"""
+    if col.endswith('_por100mil'):
+        return f"{format_crime_label(col[:-len('_por100mil')])} (por 100 mil hab.)"
+    return format_crime_label(col)
+
+
+def build_histogram(df, variable):
+    """Histograma de uma variável numérica"""
+    return px.histogram(
+        df,
+        x=variable,
+        title=f"Distribuição de {variable}",
+        color_discrete_sequence=['#1f77b4']
+    )
+
+
+def build_uf_bar(df):
+    """Total de vítimas por UF"""
+    df_uf = df.groupby('uf', as_index=False)['vitimas_totais'].sum().sort_values('vitimas_totais', ascending=False)
+
+    fig = px.bar(
+        df_uf,
+        x='uf',
+        y='vitimas_totais',
+        title='Total de Crimes por Unidade Federativa',
+        labels={'vitimas_totais': 'Total de Vítimas', 'uf': 'UF'},
+        color='vitimas_totais',
+        color_continuous_scale='Reds'
+    )
+    fig.update_layout(height=500)
+    return fig
+
+
+def build_correlation_heatmap(df):
+    """Matriz de correlação entre variáveis econômicas e criminalidade"""
+    corr = df[ECONOMIC_COLUMNS + CRIME_COLUMNS].corr().round(2)
+
+    fig = ff.create_annotated_heatmap(
+        z=corr.values,
+        x=list(corr.columns),
+        y=list(corr.index),
+        colorscale='Greens',
+        zmin=-1, zmax=1,
+        showscale=True
+    )
+    fig.update_layout(
+        title="Correlação: Variáveis Econômicas × Criminalidade",
+        width=1200, height=800
+    )
+    return fig
+
+
+def build_rate_correlation_heatmap(df):
+    """Matriz de correlação entre PIB per capita e taxas de crime"""
+    corr_taxas = df[RATE_COLUMNS + ['vl_pib_per_capta']].corr()
+
+    fig = go.Figure(data=go.Heatmap(
+        z=corr_taxas.values,
+        x=corr_taxas.columns,
+        y=corr_taxas.columns,
+        colorscale='Blues',
+        zmin=-1,
+        zmax=1,
+        showscale=True,
+        text=corr_taxas.values.round(2),
+        texttemplate="%{text}"
+    ))
+    fig.update_layout(
+        title='Correlação: PIB per capita × Taxas de Crime (por 100 mil hab.)',
+        width=900, height=700
+    )
+    return fig
+
+
+def build_rate_means_bar(df):
+    """Taxas médias de vítimas por 100 mil habitantes"""
+    df_media = df[RATE_COLUMNS].mean().sort_values()
+
+    fig = px.bar(
+        df_media,
+        x=df_media.values,
+        y=df_media.index,
+        orientation='h',
+        title='Taxas Médias de Vítimas por 100 mil habitantes',
+        labels={'x': 'Taxa por 100 mil habitantes', 'y': 'Tipo de Crime'},
+        color=df_media.values,
+        color_continuous_scale='Oranges'
+    )
+    fig.update_layout(height=500, showlegend=False)
+    return fig
+
+
+def build_temporal_line(df, crime_type):
+    """Evolução anual de um tipo de crime"""
+    df_temporal = df.groupby('ano')[crime_type].sum().reset_index()
+
+    fig = px.line(
+        df_temporal,
+        x='ano',
+        y=crime_type,
+        title=f'Evolução de {format_crime_label(crime_type)} ao Longo do Tempo',
+        markers=True
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+def build_model_results_table(all_results):
+    """Métricas de todos os modelos avaliados, com rótulos de exibição"""
+    results_df = pd.DataFrame(all_results).T.round(4)
+    display_df = results_df[['r2_test', 'rmse_test', 'mae_test', 'cv_r2_mean', 'cv_r2_std']].copy()
+    display_df.columns = ['R² (Teste)', 'RMSE (Teste)', 'MAE (Teste)', 'CV R² (Média)', 'CV R² (Std)']
+    return display_df
+
+
+def build_model_metric_bar(display_df, metric, color_scale):
+    """Comparação de uma métrica entre os modelos"""
+    fig = px.bar(
+        x=display_df.index,
+        y=display_df[metric],
+        title=f'Comparação de {metric.split(" ")[0]} entre Modelos',
+        labels={'x': 'Modelo', 'y': metric},
+        color=display_df[metric],
+        color_continuous_scale=color_scale
+    )
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+def build_feature_importance_bar(feature_importance):
+    """Importância por permutação das features, agrupada por modelo"""
+    df_importance = pd.concat(
+        [imp.assign(modelo=nome) for nome, imp in feature_importance.items()],
+        ignore_index=True
+    )
+
+    fig = px.bar(
+        df_importance,
+        x='importance_mean',
+        y='feature',
+        color='modelo',
+        barmode='group',
+        orientation='h',
+        error_x='importance_std',
+        title='Importância por Permutação (queda no R² de teste)',
+        labels={'importance_mean': 'Queda no R²', 'feature': 'Feature', 'modelo': 'Modelo'}
+    )
+    fig.update_layout(height=500)
+    return fig
+
+
+# Figuras da Análise Exploratória, por nome
+EDA_FIGURE_BUILDERS = {
+    'uf': build_uf_bar,
+    'correlacao': build_correlation_heatmap,
+    'correlacao_taxas': build_rate_correlation_heatmap,
+    'taxas': build_rate_means_bar,
+    'temporal': build_temporal_line,
+    'histograma': build_histogram
+}
+
+# Colunas lidas por cada figura (além das passadas como argumento)
+EDA_FIGURE_COLUMNS = {
+    'uf': ['uf', 'vitimas_totais'],
+    'correlacao': ECONOMIC_COLUMNS + CRIME_COLUMNS,
+    'correlacao_taxas': RATE_COLUMNS + ['vl_pib_per_capta'],
+    'taxas': RATE_COLUMNS,
+    'temporal': ['ano'],
+    'histograma': []
+}
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+Script de Indexação de Dados
+Estruturas pré-computadas sobre o dataset carregado para consultas rápidas
+"""
+
+import pandas as pd
+import numpy as np
+from data_processing import CrimeRateCalculator
+
+
+class MunicipalityIndex:
+    """
+    Índice por município (municipio_agrupado)
+
+    Recebe o dataset já com as taxas *_por100mil (ex.: load_rate_frame da
+    feature store), sem recalculá-las. Construído uma única vez no carregamento: para cada município guarda as
+    posições das linhas ordenadas por ano, as séries de vítimas e de taxas por
+    100 mil habitantes e o ranking entre os municípios da mesma UF. Consultas
+    são O(1) (acesso a dicionário), sem varrer o DataFrame.
+    """
+    def __init__(self, df, rate_column='vitimas_totais_por100mil'):
+        self.rate_column = rate_column
+        self.crime_columns = CrimeRateCalculator().crime_columns
+        self._profiles = {}
+        self._by_uf = {}
+        self._build(df)
+
+    def _build(self, df):
+        rate_cols = [f'{c}_por100mil' for c in self.crime_columns]
+
+        # Posição original de cada linha, ordenada por município e ano
+        # (assign cria uma cópia: o DataFrame recebido pode ser compartilhado)
+        df_sorted = df.assign(_pos=np.arange(len(df))).sort_values(['municipio_agrupado', 'ano'], kind='mergesort')
+
+        # Ranking anual da taxa dentro da UF (1 = maior taxa); taxas ausentes
+        # não entram no ranking e ficam sem posição (<NA>)
+        df_sorted['rank_uf_ano'] = (
+            df_sorted.groupby(['uf', 'ano'])[self.rate_column]
+            .rank(ascending=False, method='min')
+            .astype('Int64')
+        )
+
+        # UF de referência: a mais frequente do município
+        uf_ref = (
+            df_sorted.groupby('municipio_agrupado')['uf']
+            .agg(lambda s: s.value_counts().index[0])
+        )
+
+        # Ranking geral pela taxa média do período entre pares da mesma UF
+        # (média dos anos com taxa; município sem nenhuma taxa fica sem posição)
+        resumo = df_sorted.groupby('municipio_agrupado')[self.rate_column].mean().to_frame('taxa_media')
+        resumo['uf'] = uf_ref
+        resumo['rank_uf'] = resumo.groupby('uf')['taxa_media'].rank(ascending=False, method='min').astype('Int64')
+        resumo['pares_uf'] = resumo.groupby('uf')['taxa_media'].transform('count')
+
+        series_cols = ['ano', 'uf', 'Total_Habitantes', 'vl_pib_per_capta'] + \
+            self.crime_columns + rate_cols + ['rank_uf_ano']
+
+        for municipio, grupo in df_sorted.groupby('municipio_agrupado', sort=True):
+            info = resumo.loc[municipio]
+            self._profiles[municipio] = {
+                'municipio': municipio,
+                'uf': info['uf'],
+                'positions': grupo['_pos'].to_numpy(),
+                'anos': grupo['ano'].to_numpy(),
+                'series': grupo[series_cols].reset_index(drop=True),
+                'taxa_media': float(info['taxa_media']),
+                'rank_uf': None if pd.isna(info['rank_uf']) else int(info['rank_uf']),
+                'pares_uf': int(info['pares_uf'])
+            }
+
+        self.municipalities = list(self._profiles.keys())
+
+        # Pares por UF já ordenados pelo ranking (sem posição ao final)
+        for perfil in sorted(self._profiles.values(),
+                             key=lambda p: (p['rank_uf'] is None, p['rank_uf'] or 0)):
+            self._by_uf.setdefault(perfil['uf'], []).append(perfil)
+
+    def __len__(self):
+        return len(self._profiles)
+
+    def __contains__(self, municipio):
+        return municipio in self._profiles
+
+    def get(self, municipio):
+        """
+        Retorna o perfil pré-computado de um município
+
+        Parameters:
+        -----------
+        municipio : str
+            Nome do município (municipio_agrupado)
+
+        Returns:
+        --------
+        profile : dict
+            Posições das linhas, séries anuais, taxa média e ranking na UF
+        """
+        if municipio not in self._profiles:
+            raise KeyError(f"Município não encontrado: {municipio}")
+        return self._profiles[municipio]
+
+    def peers(self, uf):
+        """Retorna os perfis dos municípios de uma UF ordenados pelo ranking"""
+        return self._by_uf.get(uf, [])
+
+
+class RateDistributionIndex:
+    """
+    Índice da distribuição de taxas por 100 mil habitantes
+
+    Mantém arrays ordenados da taxa por UF, por ano, por (UF, ano) e para o
+    conjunto completo. Percentis e municípios comparáveis são obtidos por
+    busca binária (np.searchsorted), em O(log n) por consulta. As taxas são
+    lidas do dataset recebido (ex.: load_rate_frame), sem recálculo.
+    """
+    def __init__(self, df, rate_column='vitimas_totais_por100mil', count_column='vitimas_totais'):
+        self.rate_column = rate_column
+        self.count_column = count_column
+        self._groups = {}
+        self._build(df)
+
+    def _build(self, df_rates):
+        taxas = df_rates[self.rate_column].to_numpy(dtype=float)
+        contagens = df_rates[self.count_column].to_numpy(dtype=float)
+        municipios = df_rates['municipio_agrupado'].to_numpy()
+        ufs = df_rates['uf'].to_numpy()
+        anos = df_rates['ano'].to_numpy()
+
+        chaves = {(None, None): np.ones(len(df_rates), dtype=bool)}
+        for uf in np.unique(ufs):
+            chaves[(uf, None)] = ufs == uf
+        for ano in np.unique(anos):
+            chaves[(None, int(ano))] = anos == ano
+            for uf in np.unique(ufs[anos == ano]):
+                chaves[(uf, int(ano))] = (ufs == uf) & (anos == ano)
+
+        # Linhas sem taxa (contagem ou população ausente) ficam fora da
+        # distribuição; grupos sem nenhuma taxa não são criados
+        taxa_valida = ~np.isnan(taxas)
+        contagem_valida = np.isfinite(contagens)
+
+        for chave, mask in chaves.items():
+            posicoes = np.flatnonzero(mask & taxa_valida)
+            if len(posicoes) == 0:
+                continue
+            ordem = posicoes[np.argsort(taxas[posicoes], kind='mergesort')]
+            self._groups[chave] = {
+                'taxas': taxas[ordem],
+                'municipios': municipios[ordem],
+                'ufs': ufs[ordem],
+                'anos': anos[ordem],
+                'media_taxa': float(taxas[posicoes].mean()),
+                'media_vitimas': float(contagens[mask & contagem_valida].mean())
+            }
+
+    def _group(self, uf=None, ano=None):
+        chave = (uf, None if ano is None else int(ano))
+        if chave not in self._groups:
+            raise KeyError(f"Sem dados de referência para UF={uf}, ano={ano}")
+        return self._groups[chave]
+
+    @property
+    def ufs(self):
+        return sorted(uf for uf, ano in self._groups if uf is not None and ano is None)
+
+    def size(self, uf=None, ano=None):
+        """Número de observações na população de referência"""
+        return len(self._group(uf, ano)['taxas'])
+
+    def mean_rate(self, uf=None, ano=None):
+        """Taxa média pré-computada da população de referência"""
+        return self._group(uf, ano)['media_taxa']
+
+    def mean_count(self, uf=None, ano=None):
+        """Número médio de vítimas pré-computado da população de referência"""
+        return self._group(uf, ano)['media_vitimas']
+
+    def percentile(self, taxa, uf=None, ano=None):
+        """
+        Calcula o percentil de uma taxa na população de referência
+
+        Parameters:
+        -----------
+        taxa : float
+            Taxa por 100 mil habitantes
+        uf, ano : optional
+            Restringem a população de referência
+
+        Returns:
+        --------
+        percentile : float
+            Percentual de observações com taxa menor ou igual (0 a 100)
+        """
+        taxas = self._group(uf, ano)['taxas']
+        return 100.0 * np.searchsorted(taxas, taxa, side='right') / len(taxas)
+
+    def nearest(self, taxa, k=5, uf=None, ano=None):
+        """
+        Retorna as k observações com taxa mais próxima
+
+        Parameters:
+        -----------
+        taxa : float
+            Taxa por 100 mil habitantes
+        k : int
+            Número de observações comparáveis
+        uf, ano : optional
+            Restringem a população de referência
+
+        Returns:
+        --------
+        nearest : pandas.DataFrame
+            Município, UF, ano e taxa das observações mais próximas
+        """
+        grupo = self._group(uf, ano)
+        taxas = grupo['taxas']
+        k = min(k, len(taxas))
+
+        # Expande a janela a partir do ponto de inserção (dois ponteiros)
+        direita = int(np.searchsorted(taxas, taxa))
+        esquerda = direita - 1
+        selecionados = []
+        while len(selecionados) < k:
+            if esquerda < 0:
+                selecionados.append(direita)
+                direita += 1
+            elif direita >= len(taxas) or taxa - taxas[esquerda] <= taxas[direita] - taxa:
+                selecionados.append(esquerda)
+                esquerda -= 1
+            else:
+                selecionados.append(direita)
+                direita += 1
+
+        return pd.DataFrame({
+            'municipio_agrupado': grupo['municipios'][selecionados],
+            'uf': grupo['ufs'][selecionados],
+            'ano': grupo['anos'][selecionados],
+            self.rate_column: taxas[selecionados]
+        })
+
+    def risk_level(self, taxa, uf=None, ano=None):
+        """Classifica o risco pelos tercis da distribuição de referência"""
+        percentil = self.percentile(taxa, uf, ano)
+        if percentil < 100 / 3:
+            return "🟢 Baixo"
+        elif percentil < 200 / 3:
+            return "🟡 Médio"
+        return "🔴 Alto"
+
+
+class RowFilterIndex:
+    """
+    Índice de bitmaps por UF e por ano sobre as linhas do dataset
+
+    Cada valor de UF e de ano tem um bitmap (np.packbits) das linhas em que
+    ocorre. Qualquer combinação de filtros vira OR dentro de cada dimensão e
+    AND entre dimensões, operando em bytes e sem tocar nas colunas do
+    DataFrame; o resultado é um vetor de posições para o take.
+    """
+    def __init__(self, df):
+        self.n_rows = len(df)
+        ufs = df['uf'].to_numpy()
+        anos = df['ano'].to_numpy()
+
+        self._all = np.packbits(np.ones(self.n_rows, dtype=bool))
+        self._uf_bitmaps = {uf: np.packbits(ufs == uf) for uf in np.unique(ufs)}
+        self._year_bitmaps = {int(ano): np.packbits(anos == ano) for ano in np.unique(anos)}
+
+    @property
+    def ufs(self):
+        return sorted(self._uf_bitmaps)
+
+    @property
+    def years(self):
+        return sorted(self._year_bitmaps)
+
+    def _union(self, bitmaps):
+        resultado = np.zeros_like(self._all)
+        for bitmap in bitmaps:
+            resultado |= bitmap
+        return resultado
+
+    def bitmap(self, ufs=None, year_range=None):
+        """
+        Combina os filtros em um bitmap de linhas
+
+        Parameters:
+        -----------
+        ufs : list, optional
+            UFs selecionadas (vazio ou None = todas)
+        year_range : tuple, optional
+            Intervalo fechado (ano inicial, ano final)
+
+        Returns:
+        --------
+        bitmap : numpy.ndarray
+            Bitmap compactado (uint8) das linhas selecionadas
+        """
+        resultado = self._all.copy()
+        if ufs:
+            resultado &= self._union(self._uf_bitmaps[uf] for uf in ufs if uf in self._uf_bitmaps)
+        if year_range is not None:
+            inicio, fim = year_range
+            resultado &= self._union(bm for ano, bm in self._year_bitmaps.items() if inicio <= ano <= fim)
+        return resultado
+
+    def positions(self, ufs=None, year_range=None):
+        """Posições (ordenadas) das linhas que atendem aos filtros"""
+        bits = np.unpackbits(self.bitmap(ufs, year_range), count=self.n_rows)
+        return np.flatnonzero(bits)
+
+    def take(self, df, ufs=None, year_range=None, columns=None):
+        """
+        Seleciona as linhas filtradas apenas nas colunas necessárias
+
+        Parameters:
+        -----------
+        df : pandas.DataFrame
+            DataFrame sobre o qual o índice foi construído
+        ufs, year_range : optional
+            Filtros, como em bitmap()
+        columns : list, optional
+            Colunas a retornar (padrão: todas)
+
+        Returns:
+        --------
+        df_filtered : pandas.DataFrame
+            Linhas e colunas selecionadas
+        """
+        positions = self.positions(ufs, year_range)
+        if columns is not None:
+            df = df[list(columns)]
+        return df.iloc[positions]
+
+
+if __name__ == "__main__":
+    # Teste do script
+    from feature_store import load_rate_frame
+
+    df = load_rate_frame()
+    index = MunicipalityIndex(df)
+    print(f"\n✓ Índice construído: {len(index)} municípios")
+    perfil = index.get(index.municipalities[0])
+    print(f"  - {perfil['municipio']} ({perfil['uf']}): "
+          f"{perfil['rank_uf']}º de {perfil['pares_uf']} na UF")
+    print(perfil['series'][['ano', 'vitimas_totais', 'vitimas_totais_por100mil', 'rank_uf_ano']])
+
+    distribution = RateDistributionIndex(df)
+    print(f"\n✓ Distribuição indexada: {distribution.size()} observações")
+    print(f"  - Taxa 100 no percentil {distribution.percentile(100):.1f}")
+    print(distribution.nearest(100, k=3))
@@ -6,8 +6,9 @@ Carrega o dataset da pasta data/raw
 
 import pandas as pd
 import os
+from data_validation import validate_data, summarize_violations, quarantine_rows
 
-def load_data(file_path='data/raw/pib-ocorrencias.csv'):
+def load_data(file_path='data/raw/pib-ocorrencias.csv', validate=True, quarantine=False):
     """
     Carrega o dataset de criminalidade e PIB
     
@@ -15,6 +16,10 @@ def load_data(file_path='data/raw/pib-ocorrencias.csv'):
     -----------
     file_path : str
         Caminho para o arquivo CSV
+    validate : bool
+        Avalia as regras de qualidade e imprime as violações encontradas
+    quarantine : bool
+        Remove as linhas com violações, gravando-as em data/quarantine
         
     Returns:
     --------
@@ -26,6 +31,18 @@ def load_data(file_path='data/raw/pib-ocorrencias.csv'):
     
     df = pd.read_csv(file_path)
     
+    if validate or quarantine:
+        violations = validate_data(df)
+        report = summarize_violations(df, violations)
+        if len(report):
+            print(f"⚠️ Violações de qualidade nos dados ({int(violations.any(axis=1).sum())} linhas):")
+            print(report.to_string(index=False))
+        if quarantine:
+            nome = os.path.splitext(os.path.basename(file_path))[0] + '_quarentena.csv'
+            df, df_quarantine = quarantine_rows(df, violations, name=nome)
+            if len(df_quarantine):
+                print(f"  - {len(df_quarantine)} linhas em quarentena: data/quarantine/{nome}")
+    
     print(f"✓ Dados carregados com sucesso!")
     print(f"  - Dimensões: {df.shape[0]} linhas x {df.shape[1]} colunas")
     print(f"  - Período: {df['ano'].min()} a {df['ano'].max()}")
@@ -119,6 +119,26 @@ def prepare_data_for_modeling(df, target='vitimas_totais'):
     
     return X, y
 
+def get_crime_targets(include_rates=True):
+    """
+    Lista os alvos de criminalidade disponíveis para modelagem
+    
+    Parameters:
+    -----------
+    include_rates : bool
+        Inclui as taxas por 100 mil habitantes
+        
+    Returns:
+    --------
+    targets : list
+        Contagens de vítimas seguidas das respectivas taxas
+    """
+    crime_columns = CrimeRateCalculator().crime_columns
+    targets = list(crime_columns)
+    if include_rates:
+        targets += [f'{col}_por100mil' for col in crime_columns]
+    return targets
+
 if __name__ == "__main__":
     # Teste do script
     from data_ingestion import load_data
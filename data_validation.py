@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Script de Validação de Dados
+Regras de qualidade avaliadas na ingestão, em uma única passada vetorizada
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+KEY_COLUMNS = ['municipio_agrupado', 'ano']
+
+# Vítimas por tipo: a soma não pode exceder vitimas_totais
+VICTIM_COMPONENT_COLUMNS = [
+    'vitimas_feminicidio', 'vitimas_homicidio_doloso', 'vitimas_lesao_corporal_seguida_de_morte',
+    'vitimas_transito_ou_decorrencia_dele', 'vitimas_sem_indicio_de_crime', 'vitimas_latrocinio',
+    'vitimas_suicidios', 'vitimas_tentativa_homicidio'
+]
+
+# Todas as colunas de contagem (não podem ser negativas)
+COUNT_COLUMNS = VICTIM_COMPONENT_COLUMNS + [
+    'vitimas_totais', 'Mandado de prisão cumprido', 'Tentativa de feminicídio', 'Total_Habitantes'
+]
+
+SECTOR_COLUMNS = ['vl_agropecuaria', 'vl_industria', 'vl_servicos', 'vl_administracao']
+
+# Descrição de cada regra, na ordem das colunas do resultado de validate_data
+VALIDATION_RULES = {
+    'valor_ausente': 'Valor ausente em coluna numérica',
+    'contagem_negativa': 'Contagem (vítimas, ocorrências ou população) negativa',
+    'total_menor_que_componentes': 'vitimas_totais menor que a soma das vítimas por tipo',
+    'setores_diferem_do_bruto': 'Soma dos setores diferente de vl_bruto_total',
+    'pib_difere_de_bruto_mais_subsidios': 'vl_bruto_total + vl_subsidios diferente de vl_pib',
+    'chave_duplicada': 'Par (municipio_agrupado, ano) repetido'
+}
+
+
+def validate_data(df, rel_tol=1e-3, abs_tol=1.0):
+    """
+    Avalia todas as regras de qualidade sobre o DataFrame
+
+    As colunas numéricas são extraídas uma única vez para um array e cada
+    regra é uma expressão vetorizada sobre ele; nenhuma regra percorre linhas.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        Dados brutos, como lidos do CSV
+    rel_tol : float
+        Tolerância relativa das regras de soma (arredondamento na fonte)
+    abs_tol : float
+        Tolerância absoluta das regras de soma (R$ mil)
+
+    Returns:
+    --------
+    violations : pandas.DataFrame
+        Matriz booleana (linhas x regras); True indica violação
+    """
+    colunas = COUNT_COLUMNS + SECTOR_COLUMNS + ['vl_bruto_total', 'vl_subsidios', 'vl_pib']
+    colunas = [c for c in colunas if c in df.columns]
+    pos = {c: i for i, c in enumerate(colunas)}
+    valores = df[colunas].to_numpy(dtype=np.float64)
+
+    def col(nome):
+        return valores[:, pos[nome]] if nome in pos else np.full(len(df), np.nan)
+
+    def cols(nomes):
+        # Seleção por nome; colunas ausentes no arquivo são ignoradas
+        return valores[:, [pos[c] for c in nomes if c in pos]]
+
+    def difere(a, b):
+        # Comparações com NaN resultam em False: ausências ficam em valor_ausente
+        return np.abs(a - b) > np.maximum(abs_tol, rel_tol * np.abs(b))
+
+    numericas = df.select_dtypes(include=[np.number]).to_numpy(dtype=np.float64)
+
+    with np.errstate(invalid='ignore'):
+        violations = {
+            'valor_ausente': np.isnan(numericas).any(axis=1),
+            'contagem_negativa': (cols(COUNT_COLUMNS) < 0).any(axis=1),
+            'total_menor_que_componentes': col('vitimas_totais') < cols(VICTIM_COMPONENT_COLUMNS).sum(axis=1),
+            'setores_diferem_do_bruto': difere(cols(SECTOR_COLUMNS).sum(axis=1), col('vl_bruto_total')),
+            'pib_difere_de_bruto_mais_subsidios': difere(col('vl_bruto_total') + col('vl_subsidios'), col('vl_pib')),
+            'chave_duplicada': df.duplicated(KEY_COLUMNS, keep='first').to_numpy()
+        }
+
+    return pd.DataFrame(violations, index=df.index)
+
+
+def summarize_violations(df, violations, max_examples=3):
+    """
+    Relatório compacto: uma linha por regra violada
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        Dados validados
+    violations : pandas.DataFrame
+        Resultado de validate_data
+    max_examples : int
+        Número de exemplos (município/ano) por regra
+
+    Returns:
+    --------
+    report : pandas.DataFrame
+        Regra, descrição, número de linhas e exemplos
+    """
+    contagens = violations.sum()
+    linhas = []
+    for regra in contagens[contagens > 0].index:
+        exemplos = df.loc[violations[regra], KEY_COLUMNS].head(max_examples)
+        linhas.append({
+            'regra': regra,
+            'descricao': VALIDATION_RULES[regra],
+            'linhas': int(contagens[regra]),
+            'exemplos': ', '.join(f"{m}/{a}" for m, a in exemplos.itertuples(index=False))
+        })
+    return pd.DataFrame(linhas, columns=['regra', 'descricao', 'linhas', 'exemplos'])
+
+
+def quarantine_rows(df, violations, quarantine_dir='data/quarantine', name='quarentena.csv'):
+    """
+    Separa as linhas com violações e as salva para inspeção
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        Dados validados
+    violations : pandas.DataFrame
+        Resultado de validate_data
+    quarantine_dir : str
+        Pasta onde as linhas em quarentena são gravadas
+    name : str
+        Nome do arquivo CSV de quarentena
+
+    Returns:
+    --------
+    df_clean : pandas.DataFrame
+        Linhas sem violações (índice reiniciado)
+    df_quarantine : pandas.DataFrame
+        Linhas removidas, com a lista de regras violadas
+    """
+    invalidas = violations.any(axis=1).to_numpy()
+    df_quarantine = df[invalidas].copy()
+    if len(df_quarantine):
+        regras = violations[invalidas]
+        df_quarantine['regras_violadas'] = [
+            ';'.join(regras.columns[linha]) for linha in regras.to_numpy()
+        ]
+        os.makedirs(quarantine_dir, exist_ok=True)
+        df_quarantine.to_csv(os.path.join(quarantine_dir, name), index=False)
+    return df[~invalidas].reset_index(drop=True), df_quarantine
+
+
+if __name__ == "__main__":
+    # Teste do script
+    import time
+
+    df = pd.read_csv('data/raw/pib-ocorrencias.csv')
+
+    # Injeta problemas em uma cópia para exercitar todas as regras
+    df_teste = pd.concat([df, df.head(2)], ignore_index=True)
+    df_teste.loc[0, 'Tentativa de feminicídio'] = -1
+    df_teste.loc[1, 'vitimas_totais'] = 0
+    df_teste.loc[2, 'vl_industria'] += 5000
+    df_teste.loc[3, 'vl_pib'] = np.nan
+
+    inicio = time.perf_counter()
+    violations = validate_data(df_teste)
+    duracao = time.perf_counter() - inicio
+
+    print(f"\n✓ {len(violations.columns)} regras avaliadas em {len(df_teste)} linhas ({duracao * 1000:.2f} ms)")
+    print(summarize_violations(df_teste, violations).to_string(index=False))
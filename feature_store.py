@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Script de Feature Store
+Materializa matrizes de features pré-processadas e as reutiliza entre execuções
+"""
+
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+from data_ingestion import load_data
+from data_processing import create_preprocessing_pipeline, CrimeRateCalculator
+
+FEATURE_COLUMNS = ['Total_Habitantes', 'vl_pib_per_capta',
+                   'vl_agropecuaria', 'vl_industria', 'vl_servicos']
+
+
+def file_fingerprint(file_path, chunk_size=1 << 20):
+    """
+    Calcula o hash SHA-256 do conteúdo de um arquivo
+
+    Parameters:
+    -----------
+    file_path : str
+        Caminho do arquivo
+    chunk_size : int
+        Tamanho dos blocos lidos
+
+    Returns:
+    --------
+    digest : str
+        Hash hexadecimal do conteúdo
+    """
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class FeatureStore:
+    """
+    Armazena matrizes transformadas por (fonte, features, alvos, parâmetros)
+
+    Cada matriz é salva como .npy (lida com memory-map) acompanhada de um .json
+    com as colunas e a configuração. O .json é gravado por último e funciona
+    como marcador de que a matriz está completa.
+    """
+    def __init__(self, root='data/features'):
+        self.root = root
+        self._lock = threading.Lock()
+        self._source_hashes = {}
+        self._loaded = {}
+
+    def source_hash(self, file_path):
+        """Hash da fonte, recalculado apenas se tamanho ou mtime mudarem"""
+        stat = os.stat(file_path)
+        chave = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+        if chave not in self._source_hashes:
+            self._source_hashes[chave] = file_fingerprint(file_path)
+        return self._source_hashes[chave]
+
+    def config_key(self, file_path, features, targets, params):
+        """Chave da matriz: hash da configuração completa de pré-processamento"""
+        config = {
+            'source': self.source_hash(file_path),
+            'features': list(features),
+            'targets': list(targets),
+            'params': params
+        }
+        payload = json.dumps(config, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()[:16], config
+
+    def get(self, file_path='data/raw/pib-ocorrencias.csv', features=None, targets=('vitimas_totais',),
+            impute_missing=True):
+        """
+        Retorna a matriz de features e alvos, materializando-a se necessário
+
+        Parameters:
+        -----------
+        file_path : str
+            Caminho do CSV de origem
+        features : list, optional
+            Colunas de features (padrão: as cinco usadas na modelagem)
+        targets : list
+            Colunas alvo (contagens ou taxas _por100mil)
+        impute_missing : bool
+            Preenche valores ausentes com a mediana antes das taxas
+
+        Returns:
+        --------
+        X : pandas.DataFrame
+            Features (apoiadas no array memory-mapped)
+        Y : pandas.DataFrame
+            Alvos
+        """
+        features = list(FEATURE_COLUMNS if features is None else features)
+        targets = list(targets)
+        params = {'impute_missing': bool(impute_missing)}
+        key, config = self.config_key(file_path, features, targets, params)
+
+        with self._lock:
+            if key not in self._loaded:
+                matrix_path = os.path.join(self.root, f'{key}.npy')
+                meta_path = os.path.join(self.root, f'{key}.json')
+                if not os.path.exists(meta_path):
+                    self._materialize(file_path, config, matrix_path, meta_path)
+                self._loaded[key] = self._open(matrix_path, meta_path)
+            matrix, meta = self._loaded[key]
+
+        n_features = len(meta['features'])
+        index = pd.RangeIndex(meta['n_rows'])
+        X = pd.DataFrame(matrix[:, :n_features], columns=meta['features'], index=index, copy=False)
+        Y = pd.DataFrame(matrix[:, n_features:], columns=meta['targets'], index=index, copy=False)
+        return X, Y
+
+    def _materialize(self, file_path, config, matrix_path, meta_path):
+        """Executa o pipeline de pré-processamento e grava a matriz"""
+        df = load_data(file_path)
+        columns = config['features'] + config['targets']
+        pipeline = create_preprocessing_pipeline(features=columns)
+        if not config['params']['impute_missing']:
+            pipeline.set_params(missing_handler='passthrough')
+        matrix = pipeline.fit_transform(df).to_numpy(dtype=np.float64)
+
+        os.makedirs(self.root, exist_ok=True)
+        tmp_matrix = matrix_path + '.tmp.npy'
+        np.save(tmp_matrix, matrix)
+        os.replace(tmp_matrix, matrix_path)
+
+        meta = dict(config, n_rows=int(matrix.shape[0]))
+        tmp_meta = meta_path + '.tmp'
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_meta, meta_path)
+        print(f"✓ Matriz de features materializada: {matrix_path} {matrix.shape}")
+
+    def _open(self, matrix_path, meta_path):
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        return np.load(matrix_path, mmap_mode='r'), meta
+
+
+# Instância compartilhada pelo processo
+default_store = FeatureStore()
+
+
+def load_rate_frame(file_path='data/raw/pib-ocorrencias.csv', store=None):
+    """
+    Dataset bruto acrescido das taxas por 100 mil lidas da feature store
+
+    Parameters:
+    -----------
+    file_path : str
+        Caminho do CSV de origem
+    store : FeatureStore, optional
+        Store usada (padrão: default_store)
+
+    Returns:
+    --------
+    df : pandas.DataFrame
+        Colunas originais e as colunas *_por100mil
+    """
+    store = store or default_store
+    df = load_data(file_path)
+    rate_columns = [f'{c}_por100mil' for c in CrimeRateCalculator().crime_columns]
+    _, taxas = store.get(file_path, features=[], targets=rate_columns, impute_missing=False)
+    df[rate_columns] = taxas.to_numpy()
+    return df
+
+
+if __name__ == "__main__":
+    # Teste do script
+    from data_processing import get_crime_targets
+
+    X, Y = default_store.get(targets=get_crime_targets())
+    print(f"\n✓ Features: {X.shape}, alvos: {Y.shape}")
+    X, Y = default_store.get(targets=get_crime_targets())
+    print("✓ Segunda leitura servida pela feature store")
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Script de Inferência
+Preditor em NumPy puro a partir dos arrays exportados por modeling.py
+
+Este módulo não importa scikit-learn: basta carregar o arquivo .npz.
+"""
+
+import numpy as np
+
+
+def flatten_trees(trees):
+    """
+    Concatena os nós de árvores do scikit-learn em arrays únicos
+
+    Os índices dos filhos passam a ser globais (offset de cada árvore) e
+    'roots' guarda o nó raiz de cada árvore. Os índices ficam em int32 para
+    manter compactos ensembles com milhares de árvores; limiares e valores
+    continuam em float64 para reproduzir as predições do scikit-learn.
+
+    Parameters:
+    -----------
+    trees : list
+        DecisionTreeRegressor treinados
+
+    Returns:
+    --------
+    arrays : dict
+        feature, threshold, left, right, value, roots e max_depth
+    """
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for tree in trees:
+        t = tree.tree_
+        roots.append(offset)
+        feature.append(t.feature)
+        threshold.append(t.threshold)
+        left.append(np.where(t.children_left == -1, -1, t.children_left + offset))
+        right.append(np.where(t.children_right == -1, -1, t.children_right + offset))
+        value.append(t.value[:, 0, 0])
+        max_depth = max(max_depth, t.max_depth)
+        offset += t.node_count
+    return {
+        'feature': np.concatenate(feature).astype(np.int32),
+        'threshold': np.concatenate(threshold),
+        'left': np.concatenate(left).astype(np.int32),
+        'right': np.concatenate(right).astype(np.int32),
+        'value': np.concatenate(value),
+        'roots': np.array(roots, dtype=np.int32),
+        'max_depth': np.array(max_depth)
+    }
+
+
+def tree_leaf_values(arrays, X):
+    """
+    Valor da folha atingida em cada árvore, para todas as amostras
+
+    Todas as amostras percorrem todas as árvores simultaneamente, um nível
+    por iteração.
+
+    Parameters:
+    -----------
+    arrays : dict
+        Árvores achatadas por flatten_trees
+    X : numpy.ndarray
+        Entradas (amostras x features)
+
+    Returns:
+    --------
+    values : numpy.ndarray
+        Matriz (amostras x árvores)
+    """
+    a = arrays
+    # Mesma precisão usada pelas árvores do scikit-learn na comparação
+    X = np.asarray(X, dtype=float).astype(np.float32).astype(np.float64)
+    rows = np.arange(len(X))[:, None]
+    nodes = np.broadcast_to(a['roots'], (len(X), len(a['roots']))).copy()
+
+    for _ in range(int(a['max_depth'])):
+        left = a['left'][nodes]
+        internal = left != -1
+        if not internal.any():
+            break
+        go_left = X[rows, a['feature'][nodes]] <= a['threshold'][nodes]
+        nodes = np.where(internal, np.where(go_left, left, a['right'][nodes]), nodes)
+
+    return a['value'][nodes]
+
+
+class NumpyRegressor:
+    """
+    Preditor vetorizado para o modelo exportado
+
+    Tipos suportados:
+    - 'linear': coeficientes e intercepto
+    - 'forest': média das árvores (RandomForest)
+    - 'boosting': valor inicial + learning_rate * soma das árvores (GradientBoosting)
+
+    As árvores são armazenadas como arrays de nós concatenados (flatten_trees)
+    e avaliadas por tree_leaf_values.
+    """
+    def __init__(self, arrays):
+        self.kind = str(arrays['kind'])
+        self.model_name = str(arrays['model_name'])
+        self.features = [str(f) for f in arrays['features']]
+        self.arrays = {k: arrays[k] for k in arrays if k not in ('kind', 'model_name', 'features')}
+
+    @classmethod
+    def load(cls, filepath='models/best_model_kernel.npz'):
+        """Carrega o kernel exportado"""
+        with np.load(filepath, allow_pickle=False) as data:
+            return cls({k: data[k] for k in data.files})
+
+    def _as_array(self, X):
+        if hasattr(X, 'columns'):
+            X = X[self.features].to_numpy()
+        return np.asarray(X, dtype=float)
+
+    def _tree_leaf_values(self, X):
+        return tree_leaf_values(self.arrays, X)
+
+    def predict(self, X):
+        """
+        Prediz para um lote de entradas
+
+        Parameters:
+        -----------
+        X : pandas.DataFrame or numpy.ndarray
+            Entradas com as features na ordem de self.features
+
+        Returns:
+        --------
+        predictions : numpy.ndarray
+            Predições do modelo
+        """
+        X = self._as_array(X)
+        a = self.arrays
+
+        if self.kind == 'linear':
+            return X @ a['coef'] + a['intercept']
+        elif self.kind == 'forest':
+            return self._tree_leaf_values(X).mean(axis=1)
+        elif self.kind == 'boosting':
+            return a['init'] + a['learning_rate'] * self._tree_leaf_values(X).sum(axis=1)
+        raise ValueError(f"Tipo de kernel desconhecido: {self.kind}")
+
+
+class TargetColumnModel:
+    """
+    Expõe uma saída de um modelo multi-saída como regressor de alvo único
+    """
+    def __init__(self, model, column):
+        self.model = model
+        self.column = column
+
+    def predict(self, X):
+        predictions = np.asarray(self.model.predict(X))
+        return predictions[:, self.column] if predictions.ndim > 1 else predictions
@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""
+Script de Teste de Carga
+Simula sessões simultâneas do dashboard contra um servidor Streamlit real (offline)
+
+O script inicia `streamlit run app.py` em modo headless (ou usa um servidor
+já em execução via --url) e abre uma conexão websocket por sessão, falando o
+mesmo protocolo do navegador: cada interação envia um rerun com o estado dos
+widgets e a latência é medida até o servidor sinalizar o fim da execução.
+As sessões rodam de fato em paralelo contra um único processo do servidor,
+então a vazão reportada é a de uma instância sob N usuários simultâneos.
+
+Uso:
+    python load_test.py --sessions 8 --iterations 3
+    python load_test.py --sessions 4 --json resultado.json --max-p95 2.0
+    python load_test.py --url http://localhost:8501 --sessions 16
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+import numpy as np
+from tornado.websocket import websocket_connect
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.NumberInput_pb2 import NumberInput
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(APP_DIR, 'app.py')
+
+# Tipos de elemento tratados como widgets pelo roteiro
+WIDGET_TYPES = ('radio', 'selectbox', 'multiselect', 'slider', 'number_input', 'button')
+
+
+def _rss_mb(pid):
+    """Memória residente de um processo em MB (None fora do Linux)"""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024**2
+    except (OSError, ValueError):
+        return None
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('localhost', 0))
+        return s.getsockname()[1]
+
+
+def start_server(port=None, timeout=60):
+    """
+    Inicia o dashboard em um processo `streamlit run` headless
+
+    Parameters:
+    -----------
+    port : int, optional
+        Porta do servidor (padrão: uma porta livre)
+    timeout : float
+        Tempo máximo de espera pelo health check (segundos)
+
+    Returns:
+    --------
+    process : subprocess.Popen
+        Processo do servidor
+    url : str
+        Endereço base do servidor
+    """
+    port = port or _free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', APP_PATH,
+         '--server.headless', 'true', '--server.port', str(port),
+         '--browser.gatherUsageStats', 'false'],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f'http://localhost:{port}'
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            urllib.request.urlopen(f'{url}/_stcore/health', timeout=1)
+            return process, url
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError(f"Servidor Streamlit não respondeu em {url}")
+
+
+class SessionDriver:
+    """
+    Conduz uma sessão do dashboard pelo websocket e registra a latência de cada rerun
+
+    Mantém o estado dos widgets como o navegador: cada rerun envia os valores
+    atuais de todos os widgets visíveis; widgets dentro de fragments disparam
+    apenas a reexecução do fragment.
+    """
+    def __init__(self, session_id, url, seed=42, timeout=60):
+        self.session_id = session_id
+        self.url = url
+        self.rng = np.random.RandomState(seed + session_id)
+        self.timeout = timeout
+        self.ws = None
+        self.widgets = {}
+        self.states = {}
+        self.timings = []
+        self.errors = []
+
+    async def _rerun(self, acao, trigger=None, fragment_id=''):
+        msg = BackMsg()
+        msg.rerun_script.query_string = ''
+        msg.rerun_script.fragment_id = fragment_id
+        visiveis = {w.id for _, w, _ in self.widgets.values()}
+        for widget_id, state in self.states.items():
+            if widget_id in visiveis:
+                msg.rerun_script.widget_states.widgets.append(state)
+        if trigger is not None:
+            msg.rerun_script.widget_states.widgets.append(trigger)
+
+        inicio = time.perf_counter()
+        await self.ws.write_message(msg.SerializeToString(), binary=True)
+        vistos = {}
+        while True:
+            raw = await asyncio.wait_for(self.ws.read_message(), self.timeout)
+            if raw is None:
+                raise ConnectionError("Conexão encerrada pelo servidor")
+            fm = ForwardMsg()
+            fm.ParseFromString(raw)
+            tipo = fm.WhichOneof('type')
+            if tipo == 'delta' and fm.delta.WhichOneof('type') == 'new_element':
+                elemento = fm.delta.new_element
+                tipo_elemento = elemento.WhichOneof('type')
+                if tipo_elemento in WIDGET_TYPES:
+                    widget = getattr(elemento, tipo_elemento)
+                    vistos[widget.label] = (tipo_elemento, widget, fm.delta.fragment_id)
+                elif tipo_elemento == 'exception':
+                    self.errors.append((acao, elemento.exception.message))
+            elif tipo == 'script_finished':
+                break
+        self.timings.append((acao, time.perf_counter() - inicio))
+
+        # Execução de fragment atualiza apenas os widgets do fragment
+        if fragment_id:
+            self.widgets.update(vistos)
+        else:
+            self.widgets = vistos
+
+    async def _set(self, acao, label, **valor):
+        tipo, widget, fragment_id = self.widgets[label]
+        state = WidgetState(id=widget.id, **valor)
+        if tipo == 'button':
+            await self._rerun(acao, trigger=state, fragment_id=fragment_id)
+        else:
+            self.states[widget.id] = state
+            await self._rerun(acao, fragment_id=fragment_id)
+
+    async def _select(self, acao, label, opcao):
+        _, widget, _ = self.widgets[label]
+        await self._set(acao, label, int_value=list(widget.options).index(opcao))
+
+    async def _explorar_eda(self):
+        if "Selecione UF(s):" in self.widgets:
+            opcoes = self.widgets["Selecione UF(s):"][1].options
+            n = self.rng.randint(0, len(opcoes) + 1)
+            escolha = sorted(self.rng.choice(len(opcoes), size=n, replace=False).tolist())
+            state = WidgetState()
+            state.int_array_value.data.extend(escolha)
+            await self._set('eda:filtro_uf', "Selecione UF(s):", int_array_value=state.int_array_value)
+
+        if "Período:" in self.widgets:
+            slider = self.widgets["Período:"][1]
+            inicio, fim = sorted(self.rng.randint(int(slider.min), int(slider.max) + 1, size=2))
+            state = WidgetState()
+            state.double_array_value.data.extend([float(inicio), float(fim)])
+            await self._set('eda:filtro_ano', "Período:", double_array_value=state.double_array_value)
+
+        if "Visualização:" in self.widgets:
+            for aba in list(self.widgets["Visualização:"][1].options):
+                await self._select(f'eda:aba:{aba}', "Visualização:", aba)
+
+        if "Selecione o tipo de crime:" in self.widgets:
+            opcoes = self.widgets["Selecione o tipo de crime:"][1].options
+            await self._set('eda:tipo_crime', "Selecione o tipo de crime:",
+                            int_value=int(self.rng.randint(len(opcoes))))
+
+    async def _fazer_predicao(self):
+        entradas = {
+            "👥 Total de Habitantes": lambda: int(self.rng.randint(5, 500) * 1000),
+            "💰 PIB per Capita (R$)": lambda: float(self.rng.uniform(8000, 80000)),
+            "🏭 Valor Indústria (R$ mil)": lambda: float(self.rng.uniform(0, 1e6)),
+            "🏢 Valor Serviços (R$ mil)": lambda: float(self.rng.uniform(1e4, 3e6))
+        }
+        for label, gerar in entradas.items():
+            if label in self.widgets:
+                campo = self.widgets[label][1]
+                if campo.data_type == NumberInput.INT:
+                    await self._set('predicao:entrada', label, int_value=int(gerar()))
+                else:
+                    await self._set('predicao:entrada', label, double_value=float(gerar()))
+
+        if "🔮 Fazer Predição" in self.widgets:
+            await self._set('predicao:submit', "🔮 Fazer Predição", trigger_value=True)
+
+    async def run(self, iterations=1):
+        """
+        Executa o roteiro: abre o app e percorre todas as páginas
+
+        A conexão permanece aberta ao final (a sessão continua viva no
+        servidor) até close().
+        """
+        ws_url = self.url.replace('http', 'ws', 1).rstrip('/') + '/_stcore/stream'
+        self.ws = await websocket_connect(ws_url)
+        try:
+            await self._rerun('inicio')
+            for _ in range(iterations):
+                paginas = list(self.widgets["Selecione uma página:"][1].options)
+                for pagina in paginas:
+                    await self._select(f'pagina:{pagina}', "Selecione uma página:", pagina)
+                    if pagina == "📊 Análise Exploratória":
+                        await self._explorar_eda()
+                    elif pagina == "🎯 Fazer Predição":
+                        await self._fazer_predicao()
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            self.errors.append(('sessao', f"{type(e).__name__}: {e}"))
+        return self
+
+    def close(self):
+        """Encerra a conexão (e a sessão no servidor)"""
+        if self.ws is not None:
+            self.ws.close()
+
+
+async def _run_sessions(url, sessions, iterations, seed, timeout, pid=None):
+    """
+    Executa as sessões em paralelo e retorna (drivers, memória do servidor)
+
+    A memória residente do processo pid é lida quando todas as sessões
+    terminaram o roteiro, com as conexões ainda abertas; só então elas são
+    encerradas.
+    """
+    drivers = [SessionDriver(i, url, seed=seed, timeout=timeout) for i in range(sessions)]
+    memoria = None
+    try:
+        await asyncio.gather(*(d.run(iterations) for d in drivers))
+        if pid is not None:
+            memoria = _rss_mb(pid)
+    finally:
+        for d in drivers:
+            d.close()
+    return drivers, memoria
+
+
+def run_load_test(sessions=4, iterations=1, seed=42, timeout=60, warmup=True, url=None):
+    """
+    Executa sessões simultâneas contra o servidor e resume as métricas
+
+    Parameters:
+    -----------
+    sessions : int
+        Número de sessões simultâneas
+    iterations : int
+        Número de vezes que cada sessão percorre todas as páginas
+    seed : int
+        Semente das escolhas de filtros e entradas
+    timeout : float
+        Tempo máximo de cada rerun (segundos)
+    warmup : bool
+        Executa uma sessão fora da medição antes (imports e caches quentes),
+        para que a memória por sessão não inclua custos únicos do processo
+    url : str, optional
+        Servidor já em execução; sem ele, um servidor local é iniciado
+
+    Returns:
+    --------
+    report : dict
+        Vazão, percentis de latência, memória por sessão e erros
+    """
+    process = None
+    if url is None:
+        process, url = start_server(timeout=timeout)
+
+    try:
+        if warmup:
+            asyncio.run(_run_sessions(url, 1, 1, seed - 1, timeout))
+        memoria_inicial = _rss_mb(process.pid) if process else None
+
+        # memoria_final é lida com as sessões ainda conectadas: o crescimento
+        # inclui o estado retido por sessão
+        inicio = time.perf_counter()
+        drivers, memoria_final = asyncio.run(_run_sessions(url, sessions, iterations, seed, timeout,
+                                                           pid=process.pid if process else None))
+        duracao = time.perf_counter() - inicio
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    latencias = np.array([t for d in drivers for _, t in d.timings])
+    por_acao = {}
+    for d in drivers:
+        for acao, t in d.timings:
+            por_acao.setdefault(acao.split(':')[0], []).append(t)
+
+    memoria = None
+    if memoria_inicial is not None and memoria_final is not None:
+        memoria = round((memoria_final - memoria_inicial) / sessions, 2)
+
+    return {
+        'sessions': sessions,
+        'iterations': iterations,
+        'reruns': int(len(latencias)),
+        'duration_s': round(duracao, 3),
+        'throughput_reruns_s': round(len(latencias) / duracao, 2),
+        'latency_s': {
+            'p50': round(float(np.percentile(latencias, 50)), 4),
+            'p95': round(float(np.percentile(latencias, 95)), 4),
+            'p99': round(float(np.percentile(latencias, 99)), 4),
+            'max': round(float(latencias.max()), 4)
+        },
+        'latency_p95_by_action_s': {
+            acao: round(float(np.percentile(ts, 95)), 4) for acao, ts in sorted(por_acao.items())
+        },
+        'server_memory_per_session_mb': memoria,
+        'errors': [(d.session_id, acao, msg) for d in drivers for acao, msg in d.errors]
+    }
+
+
+def main():
+    """Função principal: executa o teste e imprime o relatório"""
+    parser = argparse.ArgumentParser(description="Teste de carga do dashboard")
+    parser.add_argument('--sessions', type=int, default=4, help="Sessões simultâneas")
+    parser.add_argument('--iterations', type=int, default=1, help="Voltas por todas as páginas")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--url', help="Servidor já em execução (padrão: inicia um servidor local)")
+    parser.add_argument('--no-warmup', action='store_true', help="Mede também a partida a frio")
+    parser.add_argument('--json', help="Salva o relatório em JSON")
+    parser.add_argument('--max-p95', type=float, help="Falha se o p95 (s) exceder este valor")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print(f"TESTE DE CARGA - {args.sessions} SESSÕES SIMULTÂNEAS")
+    print("="*60)
+
+    report = run_load_test(args.sessions, args.iterations, args.seed, args.timeout,
+                           warmup=not args.no_warmup, url=args.url)
+
+    print(f"\n   Reruns: {report['reruns']} em {report['duration_s']:.2f}s")
+    print(f"   Vazão: {report['throughput_reruns_s']:.2f} reruns/s")
+    print(f"   Latência p50/p95/p99: {report['latency_s']['p50']:.3f}s / "
+          f"{report['latency_s']['p95']:.3f}s / {report['latency_s']['p99']:.3f}s")
+    if report['server_memory_per_session_mb'] is not None:
+        print(f"   Memória do servidor por sessão: {report['server_memory_per_session_mb']:.2f} MB")
+    print("\n   p95 por ação:")
+    for acao, p95 in report['latency_p95_by_action_s'].items():
+        print(f"     {acao:<12} {p95:.3f}s")
+    if report['errors']:
+        print(f"\n⚠️ {len(report['errors'])} erro(s):")
+        for sessao, acao, msg in report['errors'][:10]:
+            print(f"   sessão {sessao} [{acao}]: {msg}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Relatório salvo em: {args.json}")
+
+    falhou = bool(report['errors'])
+    if args.max_p95 is not None and report['latency_s']['p95'] > args.max_p95:
+        print(f"\n❌ p95 {report['latency_s']['p95']:.3f}s acima do limite {args.max_p95:.3f}s")
+        falhou = True
+    return 1 if falhou else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
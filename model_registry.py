@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+Script de Registro de Modelos
+Versiona os artefatos treinados e troca o modelo em uso sem reiniciar o app
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from collections.abc import Mapping
+from datetime import datetime
+import joblib
+from inference import NumpyRegressor
+
+MANIFEST_FILE = 'manifest.json'
+
+# Nome de arquivo de cada artefato dentro da pasta da versão
+ARTIFACT_FILES = {
+    'model': 'best_model.pkl',
+    'info': 'best_model_info.pkl',
+    'preprocessor': 'preprocessor.pkl',
+    'kernel': 'best_model_kernel.npz',
+    'neighbors': 'neighbors_index.pkl',
+    'multi_target': 'multi_target_models.pkl'
+}
+
+# Entradas do bundle do modelo que dependem do scikit-learn; as demais
+# (nome, métricas, importâncias) também são gravadas no artefato 'info'
+MODEL_OBJECT_KEYS = ('model', 'explainer', 'interval_model')
+
+
+class LazyArtifacts(Mapping):
+    """
+    Dicionário somente leitura com entradas carregadas sob demanda
+
+    values traz as entradas já disponíveis; loaders associa cada entrada
+    restante a uma função sem argumentos, executada uma única vez no primeiro
+    acesso (mesmo com várias threads) e cujo resultado é mantido.
+    """
+    def __init__(self, values=None, loaders=None):
+        self._values = dict(values or {})
+        self._loaders = {k: f for k, f in (loaders or {}).items() if k not in self._values}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        if key not in self._values:
+            if key not in self._loaders:
+                raise KeyError(key)
+            with self._lock:
+                if key not in self._values:
+                    self._values[key] = self._loaders[key]()
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(list(self._values) + [k for k in self._loaders if k not in self._values])
+
+    def __len__(self):
+        return len(set(self._values) | set(self._loaders))
+
+    def load_all(self):
+        """Carrega todas as entradas pendentes (inclusive as aninhadas)"""
+        for valor in self.values():
+            if isinstance(valor, LazyArtifacts):
+                valor.load_all()
+        return self
+
+
+def new_model_version(models_dir='models'):
+    """
+    Cria a pasta de uma nova versão de artefatos
+
+    A pasta é criada sem exist_ok: se já existir, FileExistsError é levantado
+    em vez de sobrescrever os arquivos de uma versão possivelmente publicada.
+
+    Parameters:
+    -----------
+    models_dir : str
+        Pasta raiz dos modelos
+
+    Returns:
+    --------
+    version : str
+        Identificador da versão (timestamp com microssegundos)
+    version_dir : str
+        Pasta onde os artefatos da versão devem ser salvos
+    """
+    version = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    version_dir = os.path.join(models_dir, 'versions', version)
+    os.makedirs(os.path.join(models_dir, 'versions'), exist_ok=True)
+    os.mkdir(version_dir)
+    return version, version_dir
+
+
+def publish_model_version(version, models_dir='models', metadata=None, keep=3):
+    """
+    Publica uma versão atualizando o manifesto de forma atômica
+
+    O manifesto é escrito em um arquivo temporário e renomeado com os.replace,
+    de modo que leitores nunca veem um manifesto parcial.
+
+    Parameters:
+    -----------
+    version : str
+        Versão criada por new_model_version
+    models_dir : str
+        Pasta raiz dos modelos
+    metadata : dict, optional
+        Informações extras gravadas no manifesto
+    keep : int
+        Número de versões mantidas em disco
+
+    Returns:
+    --------
+    manifest : dict
+        Conteúdo do manifesto publicado
+    """
+    version_dir = os.path.join(models_dir, 'versions', version)
+    artifacts = {
+        name: os.path.join('versions', version, filename)
+        for name, filename in ARTIFACT_FILES.items()
+        if os.path.exists(os.path.join(version_dir, filename))
+    }
+    if 'model' not in artifacts:
+        raise FileNotFoundError(f"Modelo não encontrado na versão {version}")
+
+    manifest = {
+        'version': version,
+        'published_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'artifacts': artifacts
+    }
+    manifest.update(metadata or {})
+
+    manifest_path = os.path.join(models_dir, MANIFEST_FILE)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+    print(f"✓ Versão {version} publicada em: {manifest_path}")
+
+    # Remove versões antigas (a publicada é sempre mantida)
+    versions_root = os.path.join(models_dir, 'versions')
+    antigas = sorted(v for v in os.listdir(versions_root) if v != version)
+    for old in antigas[:max(0, len(antigas) - (keep - 1))]:
+        shutil.rmtree(os.path.join(versions_root, old), ignore_errors=True)
+
+    return manifest
+
+
+def _load_if_exists(path, loader=joblib.load):
+    return loader(path) if path and os.path.exists(path) else None
+
+
+def _load_neighbors_index(path):
+    # Importado aqui: o índice (KD-tree) é o único artefato da predição que
+    # precisa do scikit-learn
+    from similarity import SimilarMunicipalityIndex
+    return _load_if_exists(path, SimilarMunicipalityIndex.load)
+
+
+def load_model_version(models_dir='models'):
+    """
+    Carrega a versão publicada
+
+    Apenas o kernel numpy de predição e os metadados de exibição (artefato
+    'info') são lidos agora. O bundle completo (estimador, explainer e
+    ensemble de intervalos), o índice de similaridade e os modelos multi-alvo
+    são carregados no primeiro acesso. Sem o artefato 'info', o bundle é lido
+    de imediato. Sem manifesto, usa os arquivos legados da raiz de models_dir.
+
+    Parameters:
+    -----------
+    models_dir : str
+        Pasta raiz dos modelos
+
+    Returns:
+    --------
+    snapshot : LazyArtifacts or None
+        Versão, bundle do modelo, preditor, índice de similaridade e
+        modelos multi-alvo
+    """
+    manifest_path = os.path.join(models_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        version = manifest['version']
+        paths = {name: os.path.join(models_dir, rel) for name, rel in manifest['artifacts'].items()}
+    else:
+        version = 'legacy'
+        paths = {name: os.path.join(models_dir, filename) for name, filename in ARTIFACT_FILES.items()}
+
+    if not os.path.exists(paths.get('model', '')):
+        return None
+
+    info = _load_if_exists(paths.get('info'))
+    if info is None:
+        model_data = LazyArtifacts(joblib.load(paths['model']))
+    else:
+        bundle = LazyArtifacts(loaders={'bundle': lambda: joblib.load(paths['model'])})
+        model_data = LazyArtifacts(info, {
+            key: (lambda key=key: bundle['bundle'].get(key)) for key in MODEL_OBJECT_KEYS
+        })
+
+    snapshot = {'version': version, 'model_data': model_data}
+    predictor = _load_if_exists(paths.get('kernel'), NumpyRegressor.load)
+    if predictor is not None:
+        snapshot['predictor'] = predictor
+
+    return LazyArtifacts(
+        snapshot,
+        {
+            # Sem kernel exportado, o próprio estimador do bundle faz a predição
+            'predictor': lambda: model_data['model'],
+            'neighbors_index': lambda: _load_neighbors_index(paths.get('neighbors')),
+            'multi_target': lambda: _load_if_exists(paths.get('multi_target'))
+        }
+    )
+
+
+class ModelRegistry:
+    """
+    Mantém a versão do modelo em uso e detecta novas publicações
+
+    current() faz apenas um stat no manifesto (no máximo a cada
+    check_interval segundos). Quando o manifesto muda, a nova versão é
+    carregada por completo em uma thread de fundo e substitui a atual com
+    uma única atribuição; até lá, e durante toda execução já iniciada, o
+    snapshot anterior continua sendo usado. A versão inicial é carregada sob
+    demanda (ver load_model_version).
+    """
+    def __init__(self, models_dir='models', check_interval=5.0):
+        self.models_dir = models_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._loading = False
+        self._last_check = 0.0
+        self._fingerprint = self._read_fingerprint()
+        self._current = load_model_version(models_dir)
+
+    def _read_fingerprint(self):
+        manifest_path = os.path.join(self.models_dir, MANIFEST_FILE)
+        try:
+            stat = os.stat(manifest_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def current(self):
+        """Retorna o snapshot em uso, disparando a recarga se houver nova versão"""
+        self.check_for_update()
+        return self._current
+
+    @property
+    def version(self):
+        return self._current['version'] if self._current else None
+
+    def check_for_update(self):
+        """
+        Verifica o fingerprint do manifesto e inicia a recarga em segundo plano
+
+        Returns:
+        --------
+        started : bool
+            True se uma recarga foi iniciada
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._loading or now - self._last_check < self.check_interval:
+                return False
+            self._last_check = now
+            fingerprint = self._read_fingerprint()
+            if fingerprint == self._fingerprint:
+                return False
+            self._loading = True
+
+        thread = threading.Thread(target=self._reload, args=(fingerprint,), daemon=True)
+        thread.start()
+        return True
+
+    def _reload(self, fingerprint):
+        try:
+            snapshot = load_model_version(self.models_dir)
+            if snapshot is not None:
+                self._current = snapshot.load_all()
+            self._fingerprint = fingerprint
+        except Exception as e:
+            # Mantém a versão atual; nova tentativa na próxima verificação
+            print(f"⚠️ Falha ao carregar nova versão do modelo: {e}")
+        finally:
+            with self._lock:
+                self._loading = False
@@ -9,13 +9,20 @@ import numpy as np
 import joblib
 import os
 from datetime import datetime
-from sklearn.model_selection import train_test_split, cross_val_score
+from sklearn.model_selection import train_test_split, cross_val_score, KFold
+from sklearn.base import clone
+from joblib import Parallel, delayed
 from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
-from sklearn.pipeline import Pipeline
 from data_ingestion import load_data
-from data_processing import prepare_data_for_modeling, MissingValueHandler
+from data_processing import get_crime_targets, MissingValueHandler
+from feature_store import default_store
+from similarity import SimilarMunicipalityIndex
+from explainability import compute_permutation_importance, FeatureContributionExplainer
+from uncertainty import BootstrapIntervalEstimator
+from inference import NumpyRegressor, TargetColumnModel, flatten_trees
+from model_registry import ARTIFACT_FILES, MODEL_OBJECT_KEYS, new_model_version, publish_model_version
 
 class ModelTrainer:
     """
@@ -27,6 +34,9 @@ class ModelTrainer:
         self.results = {}
         self.best_model = None
         self.best_model_name = None
+        self.feature_importance = {}
+        self.explainer = None
+        self.interval_model = None
         
     def create_models(self):
         """Cria dicionário de modelos a serem treinados"""
@@ -115,8 +125,78 @@ class ModelTrainer:
         
         return self.results
     
-    def save_model(self, filepath='models/best_model.pkl'):
-        """Salva o melhor modelo"""
+    def compute_explanations(self, X_train, X_test, y_test, n_repeats=10, n_jobs=-1):
+        """
+        Calcula importância por permutação de todos os modelos e prepara o
+        explicador de contribuições do melhor modelo
+        
+        Parameters:
+        -----------
+        X_train : pandas.DataFrame
+            Features de treino (background do explicador)
+        X_test, y_test : pandas.DataFrame, pandas.Series
+            Conjunto de avaliação da importância por permutação
+        n_repeats : int
+            Número de permutações por feature
+        n_jobs : int
+            Número de processos (-1 usa todos os núcleos)
+            
+        Returns:
+        --------
+        feature_importance : dict
+            Importância por permutação de cada modelo
+        """
+        print("\n🔍 Calculando importância das features...")
+        
+        for name, model in self.models.items():
+            importance = compute_permutation_importance(
+                model, X_test, y_test, n_repeats=n_repeats,
+                n_jobs=n_jobs, random_state=self.random_state
+            )
+            self.feature_importance[name] = importance
+            principal = importance.iloc[0]
+            print(f"   {name}: {principal['feature']} ({principal['importance_mean']:.4f})")
+        
+        self.explainer = FeatureContributionExplainer(self.best_model).fit(X_train)
+        
+        return self.feature_importance
+    
+    def fit_prediction_intervals(self, X_train, y_train, n_bootstrap=100, n_jobs=-1):
+        """
+        Treina o ensemble bootstrap do melhor modelo para intervalos de confiança
+        
+        Parameters:
+        -----------
+        X_train : pandas.DataFrame
+            Features de treino
+        y_train : pandas.Series
+            Target de treino
+        n_bootstrap : int
+            Número de membros do ensemble
+        n_jobs : int
+            Número de processos (-1 usa todos os núcleos)
+            
+        Returns:
+        --------
+        interval_model : BootstrapIntervalEstimator
+            Ensemble treinado
+        """
+        print(f"\n📏 Treinando ensemble bootstrap ({n_bootstrap} membros) de {self.best_model_name}...")
+        
+        self.interval_model = BootstrapIntervalEstimator(
+            self.best_model, n_bootstrap=n_bootstrap,
+            random_state=self.random_state, n_jobs=n_jobs
+        ).fit(X_train, y_train)
+        
+        return self.interval_model
+    
+    def save_model(self, filepath='models/best_model.pkl', info_filepath=None):
+        """
+        Salva o melhor modelo
+
+        Com info_filepath, grava também os metadados de exibição (sem os
+        objetos do scikit-learn), lidos sem carregar o bundle completo.
+        """
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
         model_data = {
@@ -124,20 +204,226 @@ class ModelTrainer:
             'model_name': self.best_model_name,
             'metrics': self.results[self.best_model_name],
             'all_results': self.results,
+            'feature_importance': self.feature_importance,
+            'explainer': self.explainer,
+            'interval_model': self.interval_model,
             'trained_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
         joblib.dump(model_data, filepath)
         print(f"\n✓ Modelo salvo em: {filepath}")
         
+        if info_filepath:
+            info = {k: v for k, v in model_data.items() if k not in MODEL_OBJECT_KEYS}
+            joblib.dump(info, info_filepath)
+            print(f"✓ Metadados do modelo salvos em: {info_filepath}")
+        
     def get_results_dataframe(self):
         """Retorna DataFrame com resultados comparativos"""
         results_df = pd.DataFrame(self.results).T
         results_df = results_df.round(4)
         return results_df
 
-def main():
-    """Função principal para executar o pipeline de modelagem"""
+def _regression_metrics(y_train, y_pred_train, y_test, y_pred_test):
+    """Métricas de treino e teste de um alvo"""
+    return {
+        'r2_train': r2_score(y_train, y_pred_train),
+        'r2_test': r2_score(y_test, y_pred_test),
+        'rmse_train': np.sqrt(mean_squared_error(y_train, y_pred_train)),
+        'rmse_test': np.sqrt(mean_squared_error(y_test, y_pred_test)),
+        'mae_train': mean_absolute_error(y_train, y_pred_train),
+        'mae_test': mean_absolute_error(y_test, y_pred_test)
+    }
+
+def _fit_target_job(name, estimator, X_train, X_test, Y_train, Y_test, splits):
+    """
+    Treina um modelo para um ou mais alvos (multi-saída) e avalia cada alvo
+    
+    Executado em um processo do pool; as divisões de validação cruzada são
+    as mesmas para todos os jobs.
+    """
+    targets = Y_train.columns.tolist()
+    y_train = Y_train.to_numpy() if len(targets) > 1 else Y_train.iloc[:, 0].to_numpy()
+    
+    model = clone(estimator).fit(X_train, y_train)
+    pred_train = np.asarray(model.predict(X_train)).reshape(len(X_train), -1)
+    pred_test = np.asarray(model.predict(X_test)).reshape(len(X_test), -1)
+    
+    # Validação cruzada com as divisões compartilhadas
+    cv_scores = np.zeros((len(splits), len(targets)))
+    for i, (idx_fit, idx_val) in enumerate(splits):
+        y_fit = y_train[idx_fit]
+        cv_model = clone(estimator).fit(X_train.iloc[idx_fit], y_fit)
+        pred_val = np.asarray(cv_model.predict(X_train.iloc[idx_val])).reshape(len(idx_val), -1)
+        cv_scores[i] = [r2_score(Y_train.iloc[idx_val, j], pred_val[:, j]) for j in range(len(targets))]
+    
+    metrics = {}
+    for j, target in enumerate(targets):
+        metrics[target] = _regression_metrics(Y_train.iloc[:, j], pred_train[:, j],
+                                              Y_test.iloc[:, j], pred_test[:, j])
+        metrics[target]['cv_r2_mean'] = cv_scores[:, j].mean()
+        metrics[target]['cv_r2_std'] = cv_scores[:, j].std()
+    
+    return name, targets, model, metrics
+
+class MultiTargetTrainer:
+    """
+    Treina os modelos para todos os alvos de criminalidade em uma única passada
+    
+    A matriz de features, a divisão treino/teste e as divisões de validação
+    cruzada são compartilhadas. LinearRegression e RandomForest são treinados
+    como modelos multi-saída nativos (um job para todos os alvos); Gradient
+    Boosting gera um job por alvo. Os jobs modelo × alvo rodam em um pool de
+    processos.
+    """
+    # Modelos com suporte nativo a múltiplas saídas
+    MULTI_OUTPUT_MODELS = ('Linear Regression', 'Random Forest')
+    
+    def __init__(self, random_state=42, cv=5, n_jobs=-1):
+        self.random_state = random_state
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.models = ModelTrainer(random_state=random_state).create_models()
+        self.results = {}
+        self.predictors = {}
+        self.best_model_names = {}
+    
+    def train_and_evaluate(self, X_train, X_test, Y_train, Y_test):
+        """
+        Treina e avalia todos os modelos para todos os alvos
+        
+        Parameters:
+        -----------
+        X_train, X_test : pandas.DataFrame
+            Features de treino e teste
+        Y_train, Y_test : pandas.DataFrame
+            Alvos de treino e teste (uma coluna por alvo)
+            
+        Returns:
+        --------
+        results : dict
+            Métricas por alvo e por modelo
+        """
+        targets = Y_train.columns.tolist()
+        splits = list(KFold(n_splits=self.cv).split(X_train))
+        
+        jobs = []
+        for name, estimator in self.models.items():
+            if name in self.MULTI_OUTPUT_MODELS:
+                jobs.append((name, estimator, targets))
+            else:
+                jobs.extend((name, estimator, [target]) for target in targets)
+        
+        print("\n" + "="*60)
+        print(f"TREINAMENTO MULTI-ALVO: {len(targets)} alvos, {len(jobs)} jobs")
+        print("="*60)
+        
+        outputs = Parallel(n_jobs=self.n_jobs)(
+            delayed(_fit_target_job)(name, estimator, X_train, X_test,
+                                     Y_train[cols], Y_test[cols], splits)
+            for name, estimator, cols in jobs
+        )
+        
+        candidates = {}
+        for name, cols, model, metrics in outputs:
+            for j, target in enumerate(cols):
+                self.results.setdefault(target, {})[name] = metrics[target]
+                candidates.setdefault(target, {})[name] = (
+                    TargetColumnModel(model, j) if len(cols) > 1 else model
+                )
+        
+        # Melhor modelo por alvo
+        for target in targets:
+            best = max(self.results[target], key=lambda k: self.results[target][k]['r2_test'])
+            self.best_model_names[target] = best
+            self.predictors[target] = candidates[target][best]
+            print(f"   {target:<45} {best:<18} R² (Teste): {self.results[target][best]['r2_test']:.4f}")
+        
+        return self.results
+    
+    def save_model(self, filepath='models/multi_target_models.pkl', features=None):
+        """Salva os melhores modelos de cada alvo"""
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        
+        bundle = {
+            'features': features,
+            'targets': {
+                target: {
+                    'model': self.predictors[target],
+                    'model_name': self.best_model_names[target],
+                    'metrics': self.results[target][self.best_model_names[target]],
+                    'all_results': self.results[target]
+                }
+                for target in self.predictors
+            },
+            'trained_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        
+        joblib.dump(bundle, filepath)
+        print(f"\n✓ Modelos multi-alvo salvos em: {filepath}")
+
+def export_inference_kernel(model, model_name, X_reference, filepath='models/best_model_kernel.npz', tol=1e-6):
+    """
+    Exporta o modelo para arrays NumPy usados por inference.NumpyRegressor
+    
+    Parameters:
+    -----------
+    model : estimator
+        LinearRegression, RandomForestRegressor ou GradientBoostingRegressor treinado
+    model_name : str
+        Nome do modelo
+    X_reference : pandas.DataFrame
+        Amostra usada para conferir o kernel contra o scikit-learn
+    filepath : str
+        Caminho do arquivo .npz
+    tol : float
+        Diferença máxima aceita entre as predições
+        
+    Returns:
+    --------
+    kernel : inference.NumpyRegressor
+        Preditor carregado a partir dos arrays exportados
+    """
+    arrays = {
+        'model_name': np.array(model_name),
+        'features': np.array(X_reference.columns.tolist())
+    }
+    
+    if isinstance(model, LinearRegression):
+        arrays['kind'] = np.array('linear')
+        arrays['coef'] = np.ravel(model.coef_).astype(float)
+        arrays['intercept'] = np.array(float(model.intercept_))
+    elif isinstance(model, RandomForestRegressor):
+        arrays['kind'] = np.array('forest')
+        arrays.update(flatten_trees(model.estimators_))
+    elif isinstance(model, GradientBoostingRegressor):
+        arrays['kind'] = np.array('boosting')
+        arrays.update(flatten_trees(model.estimators_[:, 0]))
+        arrays['init'] = np.array(float(np.ravel(model.init_.predict(X_reference.iloc[:1]))[0]))
+        arrays['learning_rate'] = np.array(float(model.learning_rate))
+    else:
+        raise ValueError(f"Modelo não suportado para exportação: {type(model).__name__}")
+    
+    kernel = NumpyRegressor(arrays)
+    diff = np.abs(kernel.predict(X_reference) - model.predict(X_reference)).max()
+    if diff > tol * max(1.0, np.abs(model.predict(X_reference)).max()):
+        raise ValueError(f"Kernel NumPy diverge do scikit-learn (diferença máxima {diff:.2e})")
+    
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    np.savez(filepath, **arrays)
+    print(f"✓ Kernel NumPy salvo em: {filepath} (diferença máxima {diff:.2e})")
+    
+    return kernel
+
+def main(multi_target=True):
+    """
+    Função principal para executar o pipeline de modelagem
+    
+    Parameters:
+    -----------
+    multi_target : bool
+        Treina também os modelos de todos os alvos de criminalidade
+    """
     print("\n" + "="*60)
     print("PIPELINE DE MACHINE LEARNING - CRIMINALIDADE RIDE/DF")
     print("="*60)
@@ -146,9 +432,10 @@ def main():
     print("\n📁 Carregando dados...")
     df = load_data()
     
-    # 2. Preparar dados
+    # 2. Preparar dados (matriz materializada na feature store)
     print("\n🔧 Preparando dados para modelagem...")
-    X, y = prepare_data_for_modeling(df, target='vitimas_totais')
+    X, Y_totais = default_store.get(targets=['vitimas_totais'])
+    y = Y_totais['vitimas_totais']
     
     # 3. Dividir em treino e teste
     print("\n✂️  Dividindo em conjuntos de treino e teste (60/40)...")
@@ -163,20 +450,51 @@ def main():
     trainer = ModelTrainer(random_state=42)
     trainer.create_models()
     results = trainer.train_and_evaluate(X_train, X_test, y_train, y_test)
+    trainer.compute_explanations(X_train, X_test, y_test)
+    trainer.fit_prediction_intervals(X_train, y_train)
     
     # 5. Exibir tabela comparativa
     print("\n📊 TABELA COMPARATIVA DE MODELOS:")
     print(trainer.get_results_dataframe())
     
-    # 6. Salvar modelo
-    trainer.save_model('models/best_model.pkl')
+    # 6. Salvar artefatos em uma nova versão
+    version, version_dir = new_model_version('models')
+    artifact_path = lambda name: os.path.join(version_dir, ARTIFACT_FILES[name])
+    trainer.save_model(artifact_path('model'), artifact_path('info'))
     
     # 7. Salvar também o preprocessador
     preprocessor = MissingValueHandler()
-    joblib.dump(preprocessor, 'models/preprocessor.pkl')
-    print("✓ Preprocessador salvo em: models/preprocessor.pkl")
+    joblib.dump(preprocessor, artifact_path('preprocessor'))
+    print(f"✓ Preprocessador salvo em: {artifact_path('preprocessor')}")
+    
+    # 8. Exportar kernel NumPy do melhor modelo
+    export_inference_kernel(trainer.best_model, trainer.best_model_name, X,
+                            filepath=artifact_path('kernel'))
+    
+    # 9. Salvar índice de municípios similares
+    neighbors_index = SimilarMunicipalityIndex().fit(X, y, df)
+    neighbors_index.save(artifact_path('neighbors'))
+    
+    # 10. Treinar todos os alvos (contagens e taxas) em uma única passada
+    if multi_target:
+        X_multi, Y = default_store.get(targets=get_crime_targets())
+        X_train_m, X_test_m, Y_train, Y_test = train_test_split(
+            X_multi, Y, test_size=0.44, random_state=42
+        )
+        multi_trainer = MultiTargetTrainer(random_state=42)
+        multi_trainer.train_and_evaluate(X_train_m, X_test_m, Y_train, Y_test)
+        multi_trainer.save_model(artifact_path('multi_target'), features=X_multi.columns.tolist())
+    
+    # 11. Publicar a versão (o dashboard troca o modelo sem reiniciar)
+    publish_model_version(version, models_dir='models',
+                          metadata={'model_name': trainer.best_model_name})
     
     return trainer
 
 if __name__ == "__main__":
-    trainer = main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Pipeline de modelagem")
+    parser.add_argument('--no-multi-target', action='store_true',
+                        help="Treina apenas o modelo de vitimas_totais")
+    args = parser.parse_args()
+    trainer = main(multi_target=not args.no_multi_target)
\ No newline at end of file
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Script de Exportação de Relatórios
+Gera um pacote HTML estático com as figuras do dashboard, sem o Streamlit
+
+Cada combinação UF × período vira uma página com as figuras da Análise
+Exploratória (a evolução temporal em todas as variantes de tipo de crime); as
+páginas são montadas em paralelo em um pool de processos. Todas as páginas
+referenciam um único plotly.min.js copiado para o pacote.
+
+Uso:
+    python report.py
+    python report.py --output reports/ride --workers 4 --ufs GO DF --years 2019 2021
+"""
+
+import argparse
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from plotly.offline import get_plotlyjs
+from data_indexing import RowFilterIndex
+from feature_store import load_rate_frame
+from model_registry import load_model_version
+from charts import (EDA_FIGURE_BUILDERS, EDA_FIGURE_COLUMNS, CRIME_COLUMNS,
+                    format_crime_label, build_model_results_table, build_model_metric_bar,
+                    build_feature_importance_bar)
+
+PLOTLY_JS_FILE = 'plotly.min.js'
+
+# Figuras de cada página (nome em EDA_FIGURE_BUILDERS, título da seção)
+REPORT_FIGURES = [
+    ('uf', 'Total de Crimes por UF'),
+    ('correlacao', 'Correlações: Variáveis Econômicas × Criminalidade'),
+    ('correlacao_taxas', 'Correlações: PIB per capita × Taxas de Crime'),
+    ('taxas', 'Taxas Padronizadas')
+]
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="{plotly_js}"></script>
+<style>
+body {{ font-family: sans-serif; margin: 2rem; color: #2c3e50; }}
+h1 {{ color: #1f77b4; }}
+table {{ border-collapse: collapse; }}
+td, th {{ border: 1px solid #ddd; padding: 0.3rem 0.6rem; text-align: right; }}
+</style>
+</head>
+<body>
+<p><a href="index.html">← Índice</a></p>
+<h1>{title}</h1>
+{body}
+</body>
+</html>
+"""
+
+# Dados de cada processo do pool (carregados uma vez no initializer)
+_worker_data = {}
+
+
+def _init_worker(file_path):
+    df = load_rate_frame(file_path)
+    _worker_data['df'] = df
+    _worker_data['index'] = RowFilterIndex(df)
+
+
+def _figure_html(fig, div_id):
+    return fig.to_html(full_html=False, include_plotlyjs=False, div_id=div_id)
+
+
+def page_filename(uf, year_range):
+    """Nome do arquivo da página de uma variante"""
+    return f"eda_{uf or 'todas'}_{year_range[0]}_{year_range[1]}.html".lower()
+
+
+def render_eda_page(uf, year_range, crime_types=CRIME_COLUMNS):
+    """
+    Monta o HTML de uma variante UF × período (executado nos processos do pool)
+
+    Parameters:
+    -----------
+    uf : str or None
+        UF da variante (None = todas)
+    year_range : tuple
+        Período (ano inicial, ano final)
+    crime_types : list
+        Tipos de crime da evolução temporal
+
+    Returns:
+    --------
+    filename : str
+        Nome do arquivo da página
+    html_page : str
+        Conteúdo HTML
+    """
+    df, index = _worker_data['df'], _worker_data['index']
+    ufs = [uf] if uf else None
+    df_filtered = index.take(df, ufs, year_range)
+    prefixo = page_filename(uf, year_range)[:-len('.html')]
+
+    partes = [f"<p>{len(df_filtered)} registros</p>"]
+    for nome, titulo in REPORT_FIGURES:
+        fig = EDA_FIGURE_BUILDERS[nome](df_filtered[EDA_FIGURE_COLUMNS[nome]])
+        partes.append(f"<h2>{titulo}</h2>\n{_figure_html(fig, f'{prefixo}_{nome}')}")
+
+    partes.append("<h2>Evolução Temporal</h2>")
+    for crime_type in crime_types:
+        fig = EDA_FIGURE_BUILDERS['temporal'](df_filtered[['ano', crime_type]], crime_type)
+        partes.append(f"<h3>{format_crime_label(crime_type)}</h3>\n"
+                      f"{_figure_html(fig, f'{prefixo}_temporal_{crime_type}')}")
+
+    titulo = f"Análise Exploratória — {uf or 'Todas as UFs'}, {year_range[0]} a {year_range[1]}"
+    return page_filename(uf, year_range), PAGE_TEMPLATE.format(
+        title=html.escape(titulo), plotly_js=PLOTLY_JS_FILE, body='\n'.join(partes)
+    )
+
+
+def render_model_page(model_data):
+    """HTML da página de modelagem a partir do bundle do modelo publicado"""
+    display_df = build_model_results_table(model_data['all_results'])
+    partes = [
+        f"<p>Melhor modelo: <strong>{html.escape(model_data['model_name'])}</strong> "
+        f"(R² = {model_data['metrics']['r2_test']:.4f})</p>",
+        display_df.to_html(),
+        _figure_html(build_model_metric_bar(display_df, 'R² (Teste)', 'Viridis'), 'modelo_r2'),
+        _figure_html(build_model_metric_bar(display_df, 'RMSE (Teste)', 'Reds_r'), 'modelo_rmse')
+    ]
+    if model_data.get('feature_importance'):
+        partes.append(_figure_html(build_feature_importance_bar(model_data['feature_importance']),
+                                   'modelo_importancia'))
+    return PAGE_TEMPLATE.format(title="Modelagem Preditiva", plotly_js=PLOTLY_JS_FILE,
+                                body='\n'.join(partes))
+
+
+def report_variants(df, ufs=None, year_ranges=None):
+    """
+    Combinações UF × período exportadas
+
+    Por padrão: todas as UFs juntas e cada UF separada, no período completo e
+    em cada ano.
+    """
+    if ufs is None:
+        ufs = [None] + sorted(df['uf'].unique())
+    if year_ranges is None:
+        anos = sorted(int(a) for a in df['ano'].unique())
+        year_ranges = [(anos[0], anos[-1])] + [(a, a) for a in anos]
+    return [(uf, tuple(yr)) for uf in ufs for yr in year_ranges]
+
+
+def export_report(output_dir='reports', file_path='data/raw/pib-ocorrencias.csv', ufs=None,
+                  year_ranges=None, crime_types=CRIME_COLUMNS, models_dir='models', max_workers=None):
+    """
+    Exporta o relatório estático completo
+
+    Parameters:
+    -----------
+    output_dir : str
+        Pasta de destino do pacote HTML
+    file_path : str
+        CSV de origem
+    ufs : list, optional
+        UFs exportadas (None na lista = todas juntas); padrão: todas e cada uma
+    year_ranges : list, optional
+        Períodos (ano inicial, ano final); padrão: completo e cada ano
+    crime_types : list
+        Tipos de crime da evolução temporal
+    models_dir : str
+        Pasta do registro de modelos (página de modelagem)
+    max_workers : int, optional
+        Processos do pool (padrão: número de CPUs)
+
+    Returns:
+    --------
+    pages : list
+        Arquivos gerados
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, PLOTLY_JS_FILE), 'w', encoding='utf-8') as f:
+        f.write(get_plotlyjs())
+
+    # Materializa as taxas na feature store antes de abrir o pool
+    df = load_rate_frame(file_path)
+    variantes = report_variants(df, ufs, year_ranges)
+
+    pages = []
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(file_path,)) as pool:
+        futures = [pool.submit(render_eda_page, uf, yr, crime_types) for uf, yr in variantes]
+        for future in futures:
+            filename, conteudo = future.result()
+            with open(os.path.join(output_dir, filename), 'w', encoding='utf-8') as f:
+                f.write(conteudo)
+            pages.append(filename)
+
+    snapshot = load_model_version(models_dir)
+    if snapshot is not None:
+        with open(os.path.join(output_dir, 'modelagem.html'), 'w', encoding='utf-8') as f:
+            f.write(render_model_page(snapshot['model_data']))
+        pages.append('modelagem.html')
+
+    links = [f'<li><a href="{p}">{html.escape(p)}</a></li>' for p in pages]
+    indice = PAGE_TEMPLATE.format(title="Relatório - Criminalidade na RIDE/DF", plotly_js=PLOTLY_JS_FILE,
+                                  body=f"<ul>\n{chr(10).join(links)}\n</ul>")
+    with open(os.path.join(output_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(indice)
+
+    return pages
+
+
+def main():
+    """Função principal: exporta o relatório com as opções da linha de comando"""
+    parser = argparse.ArgumentParser(description="Exporta o relatório estático do dashboard")
+    parser.add_argument('--output', default='reports', help="Pasta de destino")
+    parser.add_argument('--workers', type=int, help="Processos do pool")
+    parser.add_argument('--ufs', nargs='+', help="UFs exportadas (padrão: todas e cada uma)")
+    parser.add_argument('--years', nargs=2, type=int, metavar=('INICIO', 'FIM'),
+                        help="Exporta apenas este período")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("EXPORTAÇÃO DO RELATÓRIO ESTÁTICO")
+    print("="*60)
+
+    inicio = time.perf_counter()
+    pages = export_report(
+        args.output,
+        ufs=[None] + args.ufs if args.ufs else None,
+        year_ranges=[tuple(args.years)] if args.years else None,
+        max_workers=args.workers
+    )
+    print(f"\n✓ {len(pages)} páginas exportadas em {time.perf_counter() - inicio:.1f}s: "
+          f"{os.path.join(args.output, 'index.html')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Script de Simulação de Cenários
+Aplica choques econômicos a todos os municípios e compara as predições com a linha de base
+"""
+
+import numpy as np
+import pandas as pd
+from feature_store import FEATURE_COLUMNS
+
+
+def shock(column, pct, ufs=None):
+    """
+    Descreve um choque percentual sobre uma feature
+
+    Parameters:
+    -----------
+    column : str
+        Feature alterada (uma de FEATURE_COLUMNS)
+    pct : float
+        Variação percentual (ex.: 10 para +10%)
+    ufs : list, optional
+        UFs afetadas (padrão: todas)
+
+    Returns:
+    --------
+    shock : dict
+        Choque no formato aceito por ScenarioEngine.simulate
+    """
+    if column not in FEATURE_COLUMNS:
+        raise ValueError(f"Feature desconhecida: {column}")
+    return {'column': column, 'pct': float(pct), 'ufs': list(ufs) if ufs else None}
+
+
+class ScenarioEngine:
+    """
+    Motor de cenários "e se" sobre os municípios reais
+
+    A base é a observação mais recente de cada município. Um cenário é um
+    vetor de multiplicadores por (município, feature), montado com máscaras
+    de UF; linha de base e cenário são preditos juntos em uma única chamada
+    ao modelo e todas as etapas são operações sobre arrays.
+    """
+    def __init__(self, predictor, df, X, features=None):
+        """
+        Parameters:
+        -----------
+        predictor : object
+            Modelo com predict(X) (sklearn ou NumpyRegressor)
+        df : pandas.DataFrame
+            Dataset carregado (municipio_agrupado, uf, ano)
+        X : pandas.DataFrame
+            Features pré-processadas, alinhadas às linhas de df
+        features : list, optional
+            Ordem das features esperada pelo modelo
+        """
+        self.predictor = predictor
+        self.features = list(FEATURE_COLUMNS if features is None else features)
+
+        # Última linha (ano mais recente) de cada município
+        ordem = np.lexsort((df['ano'].to_numpy(), df['municipio_agrupado'].to_numpy()))
+        municipios = df['municipio_agrupado'].to_numpy()[ordem]
+        ultimas = ordem[np.append(municipios[1:] != municipios[:-1], True)]
+
+        self.municipios = df['municipio_agrupado'].to_numpy()[ultimas]
+        self.ufs = df['uf'].to_numpy()[ultimas]
+        self.anos = df['ano'].to_numpy()[ultimas].astype(int)
+        self.X_base = np.asarray(X[self.features], dtype=float)[ultimas]
+
+    def multipliers(self, shocks=(), pib_growth=None, target_year=2030):
+        """
+        Monta a matriz de multiplicadores do cenário
+
+        Parameters:
+        -----------
+        shocks : list
+            Choques criados com shock()
+        pib_growth : float, optional
+            Crescimento anual (%) do PIB per capita até target_year
+        target_year : int
+            Ano final da projeção de crescimento
+
+        Returns:
+        --------
+        multipliers : numpy.ndarray
+            Matriz (municípios x features) aplicada sobre X_base
+        """
+        mult = np.ones_like(self.X_base)
+        for s in shocks:
+            afetados = np.isin(self.ufs, s['ufs']) if s['ufs'] else np.ones(len(self.ufs), dtype=bool)
+            mult[afetados, self.features.index(s['column'])] *= 1 + s['pct'] / 100
+
+        if pib_growth and 'vl_pib_per_capta' in self.features:
+            # Juros compostos do ano de cada observação até o ano alvo
+            anos = np.clip(target_year - self.anos, 0, None)
+            mult[:, self.features.index('vl_pib_per_capta')] *= (1 + pib_growth / 100) ** anos
+
+        return mult
+
+    def simulate(self, shocks=(), pib_growth=None, target_year=2030):
+        """
+        Prediz linha de base e cenário e calcula as diferenças
+
+        Parameters:
+        -----------
+        shocks, pib_growth, target_year :
+            Definição do cenário, como em multipliers()
+
+        Returns:
+        --------
+        por_municipio : pandas.DataFrame
+            Linha de base, cenário e variação por município
+        por_uf : pandas.DataFrame
+            Totais e variação agregados por UF
+        """
+        X_cenario = self.X_base * self.multipliers(shocks, pib_growth, target_year)
+
+        # Um único lote: linha de base seguida do cenário
+        lote = pd.DataFrame(np.vstack([self.X_base, X_cenario]), columns=self.features)
+        predicoes = np.asarray(self.predictor.predict(lote), dtype=float)
+        n = len(self.X_base)
+        base, cenario = predicoes[:n], predicoes[n:]
+
+        delta = cenario - base
+        por_municipio = pd.DataFrame({
+            'municipio_agrupado': self.municipios,
+            'uf': self.ufs,
+            'ano_base': self.anos,
+            'linha_base': base,
+            'cenario': cenario,
+            'delta': delta,
+            'delta_pct': np.divide(delta * 100, base, out=np.zeros_like(delta), where=base != 0)
+        })
+
+        por_uf = por_municipio.groupby('uf', as_index=False)[['linha_base', 'cenario', 'delta']].sum()
+        por_uf['delta_pct'] = np.divide(
+            por_uf['delta'] * 100, por_uf['linha_base'],
+            out=np.zeros(len(por_uf)), where=por_uf['linha_base'].to_numpy() != 0
+        )
+        return por_municipio, por_uf
+
+
+if __name__ == "__main__":
+    # Teste do script
+    import joblib
+    from data_ingestion import load_data
+    from feature_store import default_store
+
+    df = load_data()
+    X, _ = default_store.get()
+    modelo = joblib.load('models/best_model.pkl')['model']
+    engine = ScenarioEngine(modelo, df, X)
+
+    por_municipio, por_uf = engine.simulate(
+        shocks=[shock('vl_industria', 10, ufs=['GO'])],
+        pib_growth=2.0
+    )
+    print(f"\n✓ {len(por_municipio)} municípios simulados")
+    print(por_uf.round(2).to_string(index=False))
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Script de Busca por Similaridade
+Encontra os municípios reais mais parecidos com uma entrada hipotética
+"""
+
+import pandas as pd
+import numpy as np
+import joblib
+import os
+from sklearn.neighbors import KDTree
+from sklearn.preprocessing import StandardScaler
+
+
+class SimilarMunicipalityIndex:
+    """
+    Índice KD-tree no espaço padronizado das features de modelagem
+
+    Usa a matriz de features da modelagem (lida da feature store), padronizada
+    com StandardScaler, e guarda o valor real do alvo de cada observação.
+    """
+    def __init__(self, leaf_size=40):
+        self.leaf_size = leaf_size
+        self.scaler = None
+        self.tree = None
+        self.features = None
+        self.reference = None
+
+    def fit(self, X, y, df):
+        """
+        Constrói o índice a partir da matriz pré-processada
+
+        Parameters:
+        -----------
+        X : pandas.DataFrame
+            Features pré-processadas (ex.: default_store.get())
+        y : pandas.Series
+            Alvo exibido junto aos vizinhos, alinhado às linhas de X
+        df : pandas.DataFrame
+            Dataset de origem da matriz (município, UF e ano de cada linha)
+
+        Returns:
+        --------
+        self : SimilarMunicipalityIndex
+        """
+        self.features = X.columns.tolist()
+        self.scaler = StandardScaler().fit(X)
+        self.tree = KDTree(self.scaler.transform(X), leaf_size=self.leaf_size)
+
+        self.reference = df[['municipio_agrupado', 'uf', 'ano']].reset_index(drop=True)
+        self.reference[y.name] = y.to_numpy()
+        return self
+
+    def query(self, X, k=5):
+        """
+        Retorna os k municípios mais similares para cada linha de X
+
+        O índice guarda uma linha por município e ano; cada município aparece
+        uma única vez no resultado, representado pelo ano mais próximo da
+        entrada (o alvo exibido é o valor real desse ano).
+
+        Parameters:
+        -----------
+        X : pandas.DataFrame
+            Entradas com as mesmas features usadas na modelagem
+        k : int
+            Número de municípios distintos
+
+        Returns:
+        --------
+        neighbors : pandas.DataFrame
+            Vizinhos com município, UF, ano, valor real do alvo e distância
+            padronizada; a coluna 'consulta' indica a linha de X de origem
+        """
+        if self.tree is None:
+            raise ValueError("Índice não construído. Execute fit() primeiro.")
+
+        municipios = self.reference['municipio_agrupado']
+        k = min(k, municipios.nunique())
+
+        # Com no máximo m anos por município, k * m vizinhos contêm ao menos
+        # k municípios distintos
+        k_busca = min(k * int(municipios.value_counts().max()), len(self.reference))
+        X_scaled = self.scaler.transform(X[self.features])
+        distances, indices = self.tree.query(X_scaled, k=k_busca)
+
+        neighbors = self.reference.iloc[indices.ravel()].reset_index(drop=True)
+        neighbors.insert(0, 'consulta', np.repeat(np.arange(len(X_scaled)), k_busca))
+        neighbors['distancia'] = distances.ravel()
+
+        # Vizinhos já vêm ordenados por distância: mantém o ano mais próximo
+        neighbors = neighbors.drop_duplicates(['consulta', 'municipio_agrupado'])
+        return neighbors.groupby('consulta').head(k).reset_index(drop=True)
+
+    def save(self, filepath='models/neighbors_index.pkl'):
+        """Salva o índice"""
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        joblib.dump(self, filepath)
+        print(f"✓ Índice de similaridade salvo em: {filepath}")
+
+    @staticmethod
+    def load(filepath='models/neighbors_index.pkl'):
+        """Carrega um índice salvo"""
+        return joblib.load(filepath)
+
+
+def find_similar_municipalities(X, k=5, filepath='models/neighbors_index.pkl'):
+    """
+    Atalho para consultar o índice salvo junto ao modelo
+
+    Parameters:
+    -----------
+    X : pandas.DataFrame
+        Entradas com as features de modelagem
+    k : int
+        Número de vizinhos
+    filepath : str
+        Caminho do índice salvo
+
+    Returns:
+    --------
+    neighbors : pandas.DataFrame
+        Resultado de SimilarMunicipalityIndex.query
+    """
+    return SimilarMunicipalityIndex.load(filepath).query(X, k=k)
+
+
+if __name__ == "__main__":
+    # Teste do script
+    from data_ingestion import load_data
+    from feature_store import default_store
+
+    df = load_data()
+    X, Y = default_store.get()
+    index = SimilarMunicipalityIndex().fit(X, Y['vitimas_totais'], df)
+    entrada = pd.DataFrame({
+        'Total_Habitantes': [50000],
+        'vl_pib_per_capta': [25000.0],
+        'vl_agropecuaria': [50000.0],
+        'vl_industria': [100000.0],
+        'vl_servicos': [300000.0]
+    })
+    print("\n=== Municípios mais similares ===")
+    print(index.query(entrada, k=5))
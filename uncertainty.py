@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Script de Incerteza das Predições
+Ensemble bootstrap do melhor modelo para intervalos de confiança
+"""
+
+import pandas as pd
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.linear_model import LinearRegression
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from inference import flatten_trees, tree_leaf_values
+
+
+def _fit_bootstrap_member(estimator, X, y, seed):
+    """Treina um membro do ensemble em uma reamostragem com reposição"""
+    rng = np.random.RandomState(seed)
+    idx = rng.randint(0, len(X), size=len(X))
+    return clone(estimator).fit(X.iloc[idx], y.iloc[idx])
+
+
+def _compact_ensemble(members, X):
+    """
+    Converte os membros treinados em arrays avaliados de uma só vez
+
+    - 'linear': coeficientes empilhados (membros x features)
+    - 'forest'/'boosting': árvores de todos os membros achatadas em um único
+      conjunto de nós, com o início e o número de árvores de cada membro
+
+    Retorna None para estimadores sem representação compacta.
+    """
+    first = members[0]
+    if isinstance(first, LinearRegression):
+        return {
+            'kind': 'linear',
+            'coef': np.vstack([np.ravel(m.coef_) for m in members]),
+            'intercept': np.array([float(m.intercept_) for m in members])
+        }
+
+    if isinstance(first, RandomForestRegressor):
+        kind, trees = 'forest', [list(m.estimators_) for m in members]
+    elif isinstance(first, GradientBoostingRegressor):
+        kind, trees = 'boosting', [list(m.estimators_[:, 0]) for m in members]
+    else:
+        return None
+
+    sizes = np.array([len(t) for t in trees])
+    ensemble = flatten_trees([tree for member_trees in trees for tree in member_trees])
+    ensemble.update({
+        'kind': kind,
+        'member_starts': np.concatenate([[0], np.cumsum(sizes)[:-1]]),
+        'member_sizes': sizes
+    })
+    if kind == 'boosting':
+        ensemble['init'] = np.array([float(np.ravel(m.init_.predict(X.iloc[:1]))[0]) for m in members])
+        ensemble['learning_rate'] = np.array([float(m.learning_rate) for m in members])
+    return ensemble
+
+
+class BootstrapIntervalEstimator:
+    """
+    Ensemble bootstrap para intervalos de confiança das predições
+
+    Os membros são treinados em paralelo e convertidos em arrays: para
+    LinearRegression os coeficientes formam uma matriz (uma multiplicação de
+    matrizes avalia o ensemble inteiro); para Random Forest e Gradient Boosting
+    as árvores de todos os membros são achatadas em um único conjunto de nós,
+    percorrido nível a nível em uma passada e reduzido por membro. Só os
+    arrays são guardados; os estimadores do scikit-learn são descartados.
+    Outros estimadores mantêm os membros e cada um prediz o lote completo.
+    """
+    def __init__(self, estimator, n_bootstrap=100, random_state=42, n_jobs=-1):
+        self.estimator = estimator
+        self.n_bootstrap = n_bootstrap
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.members = []
+        self.features = None
+        self.ensemble = None
+
+    def fit(self, X, y):
+        """
+        Treina os membros do ensemble
+
+        Parameters:
+        -----------
+        X : pandas.DataFrame
+            Features de treino
+        y : pandas.Series
+            Target de treino
+
+        Returns:
+        --------
+        self : BootstrapIntervalEstimator
+        """
+        self.features = X.columns.tolist()
+        seeds = np.random.RandomState(self.random_state).randint(0, 2**31 - 1, size=self.n_bootstrap)
+        members = Parallel(n_jobs=self.n_jobs)(
+            delayed(_fit_bootstrap_member)(self.estimator, X, y, seed) for seed in seeds
+        )
+
+        self.ensemble = _compact_ensemble(members, X)
+        self.members = members if self.ensemble is None else []
+        return self
+
+    def predict_members(self, X):
+        """
+        Predições de todos os membros
+
+        Parameters:
+        -----------
+        X : pandas.DataFrame
+            Entradas com as features do modelo
+
+        Returns:
+        --------
+        predictions : numpy.ndarray
+            Matriz (amostras x membros)
+        """
+        X = X[self.features]
+        e = self.ensemble
+        if e is None:
+            return np.column_stack([m.predict(X) for m in self.members])
+
+        X = X.to_numpy(dtype=float)
+        if e['kind'] == 'linear':
+            return X @ e['coef'].T + e['intercept']
+
+        # Soma das árvores de cada membro: uma única passada por todas as árvores
+        sums = np.add.reduceat(tree_leaf_values(e, X), e['member_starts'], axis=1)
+        if e['kind'] == 'forest':
+            return sums / e['member_sizes']
+        return e['init'] + e['learning_rate'] * sums
+
+    def predict_interval(self, X, confidence=0.90):
+        """
+        Calcula o intervalo de confiança bootstrap (percentis do ensemble)
+
+        Parameters:
+        -----------
+        X : pandas.DataFrame
+            Entradas com as features do modelo
+        confidence : float
+            Nível de confiança do intervalo
+
+        Returns:
+        --------
+        interval : pandas.DataFrame
+            Colunas 'lower' e 'upper' para cada linha de X
+        """
+        alpha = (1 - confidence) / 2
+        lower, upper = np.quantile(self.predict_members(X), [alpha, 1 - alpha], axis=1)
+        return pd.DataFrame({'lower': lower, 'upper': upper}, index=X.index)
+
+
+if __name__ == "__main__":
+    # Teste do script
+    from data_ingestion import load_data
+    from data_processing import prepare_data_for_modeling
+
+    df = load_data()
+    X, y = prepare_data_for_modeling(df)
+    intervals = BootstrapIntervalEstimator(LinearRegression(), n_bootstrap=200).fit(X, y)
+    print("\n=== Intervalos de Confiança (90%) ===")
+    print(intervals.predict_interval(X.head()).assign(real=y.head().to_numpy()))
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Script de Aquecimento de Caches
+Executa em segundo plano as cargas e cálculos caros antes do primeiro acesso
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class CacheWarmup:
+    """
+    Executa tarefas de aquecimento em um pool de threads, por etapas
+
+    Cada etapa é um dicionário {nome: função}; as tarefas de uma etapa rodam
+    em paralelo e a etapa seguinte só começa quando a anterior termina (por
+    exemplo, figuras dependem dos dados já carregados). Falhas são registradas
+    no status e não interrompem as demais tarefas.
+    """
+    def __init__(self, stages, max_workers=4):
+        self.stages = [dict(stage) for stage in stages]
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._status = {nome: 'pendente' for stage in self.stages for nome in stage}
+        self._errors = {}
+        self._started_at = None
+        self._finished_at = None
+        self._thread = None
+
+    def start(self):
+        """Inicia o aquecimento em uma thread de fundo (apenas uma vez)"""
+        with self._lock:
+            if self._thread is None:
+                self._started_at = time.monotonic()
+                self._thread = threading.Thread(target=self._run, name='cache-warmup', daemon=True)
+                self._thread.start()
+        return self
+
+    def _run_task(self, nome, func):
+        with self._lock:
+            self._status[nome] = 'executando'
+        try:
+            func()
+            status = 'pronto'
+        except Exception as e:
+            self._errors[nome] = str(e)
+            status = 'erro'
+            print(f"⚠️ Falha no aquecimento de '{nome}': {e}")
+        with self._lock:
+            self._status[nome] = status
+
+    def _run(self):
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='cache-warmup') as pool:
+            for stage in self.stages:
+                list(pool.map(lambda item: self._run_task(*item), stage.items()))
+        self._finished_at = time.monotonic()
+
+    def wait(self, timeout=None):
+        """Aguarda o fim do aquecimento; retorna True se terminou"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    @property
+    def ready(self):
+        return self._finished_at is not None
+
+    def status(self):
+        """
+        Resumo do estado do aquecimento
+
+        Returns:
+        --------
+        status : dict
+            ready, tarefas concluídas/total, tempo decorrido (s), status por
+            tarefa e erros
+        """
+        with self._lock:
+            tarefas = dict(self._status)
+        fim = self._finished_at if self._finished_at is not None else time.monotonic()
+        return {
+            'ready': self.ready,
+            'done': sum(s in ('pronto', 'erro') for s in tarefas.values()),
+            'total': len(tarefas),
+            'elapsed_s': round(fim - self._started_at, 2) if self._started_at is not None else 0.0,
+            'tasks': tarefas,
+            'errors': dict(self._errors)
+        }